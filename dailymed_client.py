@@ -1,9 +1,74 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
 import json
 import argparse
+import copy
+import io
+import os
+import re
+import shelve
 import sys
+import threading
+import time
 import xml.etree.ElementTree as ET
-from typing import Dict, Any, Optional, Union, List, Set, Generator
+from collections import OrderedDict, deque
+from urllib.parse import urlencode
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, TextIO, Dict, Any, Optional, Union, List, Set, Generator
+
+try:
+    # Optional: several times faster JSON decoding/encoding. Falls back to the stdlib json module.
+    import orjson
+except ImportError:
+    orjson = None
+
+# Default (HL7 v3) namespace of SPL documents; passed to the path-based find/findall calls
+# in _parse_spl_xml (ElementPath compiles and caches each path expression on first use)
+SPL_NS = {"": "urn:hl7-org:v3"}
+# Qualified tag names for Element.iter() and single-child find(). Without a namespaces
+# argument a plain tag takes the C fast path and never enters the Python XPath engine
+CODE_TAG = "{urn:hl7-org:v3}code"
+NAME_TAG = "{urn:hl7-org:v3}name"
+FORM_CODE_TAG = "{urn:hl7-org:v3}formCode"
+SECTION_TAG = "{urn:hl7-org:v3}section"
+INGREDIENT_TAG = "{urn:hl7-org:v3}ingredient"
+MANUFACTURED_PRODUCT_TAG = "{urn:hl7-org:v3}manufacturedProduct"
+PARAGRAPH_TAG = "{urn:hl7-org:v3}paragraph"
+REPRESENTED_ORGANIZATION_TAG = "{urn:hl7-org:v3}representedOrganization"
+# Active ingredient class codes, in the order they are reported
+ACTIVE_CLASS_CODES = ("ACTIB", "ACTI", "ACTIM", "ACTIR")
+
+_WS_RE = re.compile(r"\s+")
+
+def _ws(text: Optional[str]) -> str:
+    """Collapse runs of whitespace to single spaces and trim; None becomes ''."""
+    return _WS_RE.sub(" ", text).strip() if text else ""
+
+def _keyword_pattern(keywords: Set[str]) -> Optional["re.Pattern"]:
+    """
+    Compiles lowercase filter keywords into a single alternation regex that matches wherever
+    any of them occurs as a substring. Returns None when there are no keywords.
+    """
+    if not keywords:
+        return None
+    # Longest first so overlapping keywords prefer the most specific match
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+
+# Heads of the SPL dosage form names (formCode displayName, e.g. "TABLET, FILM COATED"),
+# used to tell whether a search listing title names a dosage form at all
+DOSAGE_FORM_KEYWORDS = (
+    "aerosol", "bar", "capsule", "cement", "concentrate", "cream", "drug delivery system",
+    "elixir", "emulsion", "enema", "film", "foam", "gas", "gel", "granule", "gum",
+    "implant", "inhalant", "injection", "insert", "jelly", "kit", "liniment", "liquid",
+    "lotion", "lozenge", "oil", "ointment", "paste", "pastille", "patch", "pellet", "pill",
+    "powder", "shampoo", "soap", "solution", "spray", "stick", "suppository", "suspension",
+    "swab", "syrup", "tablet", "tape", "tincture", "troche", "wafer",
+)
+_DOSAGE_FORM_RE = re.compile(r"\b(?:%s)s?\b" % "|".join(re.escape(k) for k in DOSAGE_FORM_KEYWORDS))
+
 
 def print_pagination_info(args: argparse.Namespace, metadata: Dict[str, Any]):
     """
@@ -51,10 +116,196 @@ class DailyMedAPI:
     
     BASE_URL = "https://dailymed.nlm.nih.gov/dailymed/services/v2"
 
+    # Max number of parsed SPLs kept in memory by _fetch_parsed_spl
+    SPL_CACHE_SIZE = 1024
+
+    # Bounds of the persistent parsed-SPL store (cache_dir/spls): entries older than
+    # SPL_STORE_MAX_AGE seconds are dropped, then the oldest beyond SPL_STORE_SIZE
+    SPL_STORE_SIZE = 20000
+    SPL_STORE_MAX_AGE = 90 * 24 * 60 * 60
+
+    # Persistent stores are pruned when opened, at most once per this many seconds
+    # (pruning reads every entry)
+    STORE_PRUNE_INTERVAL = 24 * 60 * 60
+    _STORE_PRUNED_AT_KEY = "__pruned_at__"
+
+    # Max number of API responses kept in memory by _make_request, and how long (seconds)
+    # a cached response is reused before it is fetched again
+    RESPONSE_CACHE_SIZE = 256
+    RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+    # Bounds of the persistent response store (cache_dir/responses), which only keeps JSON
+    # listings: past cache_ttl an entry stays only if it can be revalidated, and only up to
+    # RESPONSE_STORE_MAX_AGE seconds; beyond RESPONSE_STORE_SIZE entries the oldest go
+    RESPONSE_STORE_SIZE = 4096
+    RESPONSE_STORE_MAX_AGE = 7 * 24 * 60 * 60
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        cache_dir: Optional[str] = None,
+        cache_ttl: Optional[float] = RESPONSE_CACHE_TTL
+    ):
+        """
+        Args:
+            max_workers: Number of threads used to fetch SPLs concurrently in search_with_filters.
+            cache_dir: Optional directory for a persistent cache of parsed SPLs and JSON API responses.
+                When omitted, both are only cached in memory for the lifetime of this client.
+            cache_ttl: Seconds an API response is reused for the same endpoint and params.
+                0 or None disables response caching.
+        """
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+
+        # Parsed SPLs keyed by (set_id, version). SPL content is immutable per version, so
+        # re-running a search with different filters skips the download and the XML parse.
+        self._spl_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._spl_cache_lock = threading.Lock()
+        self._spl_store = None
+        # In-progress SPL fetches keyed like _spl_cache; resolved once the parse is cached
+        self._inflight_spls: Dict[tuple, Future] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._spl_store = shelve.open(os.path.join(cache_dir, "spls"))
+            self._prune_store(self._spl_store, self.SPL_STORE_MAX_AGE, self.SPL_STORE_SIZE)
+
+        # API responses keyed by endpoint + sorted query string, stored as (fetched_at, value).
+        # Listings and labels change at most daily, so repeat calls within cache_ttl skip the network
+        self._response_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        self._response_store = None
+        if cache_dir and cache_ttl:
+            self._response_store = shelve.open(os.path.join(cache_dir, "responses"))
+            self._prune_store(
+                self._response_store, self.RESPONSE_STORE_MAX_AGE, self.RESPONSE_STORE_SIZE,
+                is_expired=lambda entry: (
+                    not isinstance(entry[1], dict)  # XML bodies (older versions persisted them)
+                    or (time.time() - entry[0] > cache_ttl and not (len(entry) > 2 and entry[2]))
+                )
+            )
+
+        # Reuse one pooled, keep-alive session for every request so repeated calls to the
+        # same host (e.g. the per-SPL XML fetches in search_with_filters) skip the TCP/TLS handshake.
+        # The pool keeps one connection per worker. It doesn't block when all are busy: the
+        # client may be shared by concurrent callers (e.g. the web app's search and autocomplete
+        # views), and waiting on a pooled connection has no timeout, so an extra connection is
+        # opened and discarded instead
+        self._base_url = self.BASE_URL.rstrip("/") + "/"
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(max_workers, 1),
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self._session.mount("https://", adapter)
+        self._session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "dailymed-client"
+        })
+
+    def close(self):
+        """Closes the HTTP session and flushes the persistent caches, if any."""
+        self._session.close()
+        if self._spl_store is not None:
+            with self._spl_cache_lock:
+                self._spl_store.close()
+                self._spl_store = None
+        if self._response_store is not None:
+            with self._response_cache_lock:
+                self._response_store.close()
+                self._response_store = None
+
+    def _prune_store(self, store: shelve.Shelf, max_age: float, max_entries: int, is_expired=None):
+        """
+        Drops old entries from a persistent store, so it doesn't grow with every lookup ever made.
+
+        Entries are tuples starting with the time they were stored. Anything else (written by an
+        older version of this client) is dropped, as is every entry older than max_age or matching
+        is_expired(entry); if more than max_entries remain, the oldest go first.
+        """
+        now = time.time()
+        if now - store.get(self._STORE_PRUNED_AT_KEY, 0) < self.STORE_PRUNE_INTERVAL:
+            return
+        stored_at = {}
+        for key in list(store.keys()):
+            if key == self._STORE_PRUNED_AT_KEY:
+                continue
+            try:
+                entry = store[key]
+            except Exception:  # Unreadable (e.g. pickled by an incompatible version)
+                entry = None
+            if (not isinstance(entry, tuple) or now - entry[0] > max_age
+                    or (is_expired is not None and is_expired(entry))):
+                del store[key]
+            else:
+                stored_at[key] = entry[0]
+        for key in sorted(stored_at, key=stored_at.get)[:max(len(stored_at) - max_entries, 0)]:
+            del store[key]
+        store[self._STORE_PRUNED_AT_KEY] = now
+
+    def _get_cached_response(self, key: str) -> Optional[tuple]:
+        """
+        Looks up a cached API response (memory first, then disk).
+
+        Returns:
+            None on a miss, otherwise (value, fresh, validators): a copy of the cached
+            response, whether it is still within cache_ttl, and the conditional request
+            headers (If-None-Match / If-Modified-Since) to revalidate it with once stale.
+        """
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None and self._response_store is not None:
+                entry = self._response_store.get(key)
+            if entry is None:
+                return None
+            # Entries written before validators were recorded are (timestamp, value)
+            validators = entry[2] if len(entry) > 2 else None
+            fresh = time.time() - entry[0] <= self.cache_ttl
+            if not fresh and not validators:
+                self._response_cache.pop(key, None)
+                if self._response_store is not None:
+                    self._response_store.pop(key, None)
+                return None
+            self._response_cache[key] = entry
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        # JSON responses are dicts that callers may modify; XML strings are immutable
+        value = copy.deepcopy(entry[1]) if isinstance(entry[1], dict) else entry[1]
+        return value, fresh, validators
+
+    def _store_cached_response(
+        self,
+        key: str,
+        value: Union[Dict[str, Any], str],
+        validators: Optional[Dict[str, str]] = None
+    ):
+        """Stores an API response in the memory cache and, if enabled, the persistent cache."""
+        entry = (time.time(), copy.deepcopy(value) if isinstance(value, dict) else value, validators)
+        with self._response_cache_lock:
+            self._response_cache[key] = entry
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+            # Only JSON listings are persisted; XML bodies are large and the parsed-SPL
+            # store already keeps what is needed from them across runs
+            if self._response_store is not None and isinstance(value, dict):
+                self._response_store[key] = entry
+
+    @staticmethod
+    def _conditional_headers(response: requests.Response) -> Optional[Dict[str, str]]:
+        """Builds the headers that revalidate a cached copy of this response, if the server sent validators."""
+        headers = {}
+        if response.headers.get("ETag"):
+            headers["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = response.headers["Last-Modified"]
+        return headers or None
+
     def _add_if_present(self, params: Dict[str, Any], key: str, value: Optional[Any]):
-        """Helper to add a parameter to the dict if it's not None."""
+        """Helper to add a parameter to the dict if it's not None (bools become 'true'/'false')."""
         if value is not None:
-            params[key] = value
+            params[key] = str(value).lower() if isinstance(value, bool) else value
 
     def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Union[Dict[str, Any], str]:
         """
@@ -65,7 +316,7 @@ class DailyMedAPI:
             params: A dictionary of query parameters for the request.
 
         Returns:
-            A dictionary parsed from the JSON response or an XML string.
+            A dictionary parsed from the JSON response, or the XML as a string.
             
         Raises:
             requests.exceptions.HTTPError: If the API returns an error status code.
@@ -73,34 +324,49 @@ class DailyMedAPI:
             json.JSONDecodeError: If the response is not valid JSON.
         """
         
-        # Clean params dictionary of None values
-        clean_params = {}
-        if params:
-            for key, value in params.items():
-                if value is not None:
-                    # Special handling for bool
-                    if isinstance(value, bool):
-                         clean_params[key] = str(value).lower()
-                    else:
-                        clean_params[key] = value
+        # Clean params dictionary of None values (bools are already converted by _add_if_present)
+        clean_params = {key: value for key, value in (params or {}).items() if value is not None}
         
-        url = f"{self.BASE_URL}/{endpoint}"
+        url = self._base_url + endpoint
+
+        cache_key = None
+        cached = None
+        if self.cache_ttl:
+            cache_key = f"{endpoint}?{urlencode(sorted(clean_params.items()))}"
+            cached = self._get_cached_response(cache_key)
+            if cached is not None and cached[1]:
+                return cached[0]
         
         try:
-            response = requests.get(url, params=clean_params, timeout=10)
+            # A stale entry with an ETag/Last-Modified is revalidated instead of refetched
+            response = self._session.get(
+                url, params=clean_params, headers=cached[2] if cached else None, timeout=10
+            )
             # Raise an exception for bad status codes (4xx or 5xx)
             response.raise_for_status()
+
+            if response.status_code == 304 and cached:
+                # Unchanged since it was cached: reuse the body and restart its TTL
+                self._store_cached_response(cache_key, cached[0], cached[2])
+                return cached[0]
             
             # Handle XML endpoint specifically
             if endpoint.endswith(".xml"):
-                return response.text
+                result = response.text
 
             # Handle JSON endpoints (default)
             # Handle potential empty responses for some endpoints
-            if not response.content:
-                return {"message": "Request successful, but no content returned."}
-                
-            return response.json()
+            elif not response.content:
+                result = {"message": "Request successful, but no content returned."}
+
+            else:
+                # Decode straight from the body bytes; response.json() would first build
+                # response.text (encoding detection + a full decoded copy)
+                result = orjson.loads(response.content) if orjson else json.loads(response.content)
+
+            if cache_key is not None:
+                self._store_cached_response(cache_key, result, self._conditional_headers(response))
+            return result
         
         except requests.exceptions.HTTPError as http_err:
             print(f"HTTP error occurred: {http_err} - {response.status_code} {response.text}", file=sys.stderr)
@@ -150,9 +416,8 @@ class DailyMedAPI:
         params = {"page": page, "pagesize": pagesize}
         self._add_if_present(params, 'application_number', application_number)
         
-        # This is tricky in argparse. Store it as a string.
-        if boxed_warning is not None:
-             self._add_if_present(params, 'boxed_warning', str(boxed_warning).lower())
+        # This is tricky in argparse; _add_if_present sends it as "true"/"false".
+        self._add_if_present(params, 'boxed_warning', boxed_warning)
         
         self._add_if_present(params, 'dea_schedule_code', dea_schedule_code)
         self._add_if_present(params, 'doctype', doctype)
@@ -217,50 +482,57 @@ class DailyMedAPI:
         current_page = page
         total_fetched = 0
         
-        while True:
+        def fetch_xml(set_id: str) -> Optional[str]:
             try:
-                # Search for SPLs
-                if rxcui:
-                    response = self.search_spls(rxcui=rxcui, pagesize=pagesize, page=current_page)
-                else:
-                    response = self.search_spls(drug_name=drug_name, pagesize=pagesize, page=current_page)
+                return self.get_spl_by_setid(set_id)
+            except Exception as e:
+                print(f"    [ERROR] Failed to fetch XML for SET ID {set_id}: {e}", file=sys.stderr)
+                return None
+
+        # XML downloads are network-bound, so each page's documents are fetched on a thread
+        # pool; executor.map keeps them in search-result order
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        try:
+            while True:
+                try:
+                    # Search for SPLs
+                    if rxcui:
+                        response = self.search_spls(rxcui=rxcui, pagesize=pagesize, page=current_page)
+                    else:
+                        response = self.search_spls(drug_name=drug_name, pagesize=pagesize, page=current_page)
                 
-                data_results = response.get("data", [])
-                metadata = response.get("metadata", {})
+                    data_results = response.get("data", [])
+                    metadata = response.get("metadata", {})
                 
-                if not data_results:
-                    break  # No more results
+                    if not data_results:
+                        break  # No more results
                 
-                # Fetch XML for each SPL
-                for item in data_results:
-                    set_id = item.get("setid")
-                    if not set_id:
-                        continue
-                    
-                    try:
-                        xml_string = self.get_spl_by_setid(set_id)
+                    # Fetch XML for each SPL
+                    set_ids = [item["setid"] for item in data_results if item.get("setid")]
+                    for xml_string in executor.map(fetch_xml, set_ids):
                         if xml_string and isinstance(xml_string, str):
                             total_fetched += 1
                             yield xml_string
-                    except Exception as e:
-                        print(f"    [ERROR] Failed to fetch XML for SET ID {set_id}: {e}", file=sys.stderr)
-                        continue
                 
-                # Check pagination
-                total_pages = int(metadata.get("total_pages", 0))
-                current_page_num = int(metadata.get("current_page", current_page))
+                    # Check pagination
+                    total_pages = int(metadata.get("total_pages", 0))
+                    current_page_num = int(metadata.get("current_page", current_page))
                 
-                print(f"Fetched page {current_page_num} of {total_pages} ({total_fetched} XMLs so far)...", file=sys.stderr)
+                    print(f"Fetched page {current_page_num} of {total_pages} ({total_fetched} XMLs so far)...", file=sys.stderr)
                 
-                if current_page_num >= total_pages:
-                    break  # Reached the end
+                    if current_page_num >= total_pages:
+                        break  # Reached the end
                 
-                current_page += 1  # Move to next page
+                    current_page += 1  # Move to next page
                 
-            except requests.exceptions.RequestException as e:
-                print(f"API search failed on page {current_page}: {e}", file=sys.stderr)
-                break
-        
+                except requests.exceptions.RequestException as e:
+                    print(f"API search failed on page {current_page}: {e}", file=sys.stderr)
+                    break
+        finally:
+            # Cancel any queued downloads if the caller stops iterating early
+            executor.shutdown(wait=False, cancel_futures=True)
+
         print(f"\nCompleted. Fetched {total_fetched} XML documents total.", file=sys.stderr)
 
     def get_spl_history(self, set_id: str) -> Dict[str, Any]:
@@ -384,20 +656,56 @@ class DailyMedAPI:
         self._add_if_present(params, 'rxtty', rxtty)
         return self._make_request("rxcuis.json", params=params)
 
-    def _parse_spl_xml(self, xml_string: str) -> Optional[Dict[str, Any]]:
+    def _fetch_and_parse_spl_xml(self, set_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Downloads an SPL XML and parses it while the body is still arriving.
+
+        The response is streamed and its (transparently gunzipped) raw body handed to the
+        parser, which reads it in chunks; the full document is never held as bytes or str.
+
+        Args:
+            set_id: The SET ID of the SPL document.
+
+        Returns:
+            A dictionary with parsed data, or None if parsing fails.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails, returns an error status,
+                or the connection breaks while the body is being read.
+        """
+        url = f"{self._base_url}spls/{set_id}.xml"
+        try:
+            with self._session.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                return self._parse_spl_xml(response.raw)
+        except requests.exceptions.RequestException as req_err:
+            print(f"Failed to fetch SPL XML from {url}: {req_err}", file=sys.stderr)
+            raise
+        except Urllib3HTTPError as read_err:
+            # The body is read by the parser straight from urllib3, so a reset or read timeout
+            # mid-download surfaces as a urllib3 error; report it like any other failed fetch
+            print(f"Failed to download SPL XML from {url}: {read_err}", file=sys.stderr)
+            raise requests.exceptions.ConnectionError(read_err) from read_err
+
+    def _parse_spl_xml(self, xml_source: Union[str, bytes, IO[bytes]]) -> Optional[Dict[str, Any]]:
         """
         Internal helper to parse a raw SPL XML string into a structured dictionary.
 
         Args:
-            xml_string: The raw XML content of an SPL.
+            xml_source: The raw XML content of an SPL (str or undecoded bytes), or a
+                binary file-like object to parse incrementally.
 
         Returns:
             A dictionary with parsed data, or None if parsing fails.
         """
         try:
-            # Remove default namespace (xmlns) to simplify findall
-            xml_string = xml_string.replace('xmlns="urn:hl7-org:v3"', '', 1)
-            root = ET.fromstring(xml_string)
+            # Parse as-is and resolve the HL7 default namespace through SPL_NS instead of
+            # rewriting the (often multi-MB) document to strip xmlns first
+            if hasattr(xml_source, "read"):
+                root = ET.parse(xml_source).getroot()
+            else:
+                root = ET.fromstring(xml_source)
             
             parsed_data = {
                 "set_id": None,
@@ -411,42 +719,39 @@ class DailyMedAPI:
             }
 
             # Find Set ID
-            set_id_elem = root.find(".//setId")
+            set_id_elem = root.find(".//setId", SPL_NS)
             if set_id_elem is not None:
                 parsed_data["set_id"] = set_id_elem.get("root")
 
             # Extract Labeler (Packager) - Look for the represented organization name in the author section
-            labeler_elem = root.find(".//author/assignedEntity/representedOrganization/name")
+            labeler_elem = root.find(".//author/assignedEntity/representedOrganization/name", SPL_NS)
             if labeler_elem is not None and labeler_elem.text:
                 parsed_data["labeler"] = labeler_elem.text.strip()
-            else:
-                # Fallback: try alternative paths for labeler
-                labeler_elem = root.find(".//author/assignedEntity/representedOrganization/name")
-                if labeler_elem is None:
-                    # Try another common path
-                    for org_elem in root.findall(".//representedOrganization"):
-                        name_elem = org_elem.find("./name")
-                        if name_elem is not None and name_elem.text:
-                            parsed_data["labeler"] = name_elem.text.strip()
-                            break
+            elif labeler_elem is None:
+                # Fallback: try another common path (an author name that exists but is empty is kept as N/A)
+                for org_elem in root.iter(REPRESENTED_ORGANIZATION_TAG):
+                    name_elem = org_elem.find(NAME_TAG)
+                    if name_elem is not None and name_elem.text:
+                        parsed_data["labeler"] = name_elem.text.strip()
+                        break
 
             # Extract NDC - Look for the product code with the NDC OID (2.16.840.1.113883.6.69)
             # This is typically in manufacturedProduct -> manufacturedProduct -> code
-            for code_elem in root.findall(".//manufacturedProduct/manufacturedProduct/code"):
+            for code_elem in root.findall(".//manufacturedProduct/manufacturedProduct/code", SPL_NS):
                 if code_elem.get("codeSystem") == "2.16.840.1.113883.6.69":
                     parsed_data["ndc"] = code_elem.get("code")
                     break
             
             # Fallback for NDC: check if it's in the containerPackagedProduct if not found above
             if parsed_data["ndc"] == "N/A":
-                for code_elem in root.findall(".//containerPackagedProduct/code"):
+                for code_elem in root.findall(".//containerPackagedProduct/code", SPL_NS):
                     if code_elem.get("codeSystem") == "2.16.840.1.113883.6.69":
                         parsed_data["ndc"] = code_elem.get("code")
                         break
             
             # Additional fallback: search more broadly for NDC codes
             if parsed_data["ndc"] == "N/A":
-                for code_elem in root.findall(".//code"):
+                for code_elem in root.findall(".//code", SPL_NS):
                     if code_elem.get("codeSystem") == "2.16.840.1.113883.6.69":
                         parsed_data["ndc"] = code_elem.get("code")
                         break
@@ -458,8 +763,8 @@ class DailyMedAPI:
             inactive_section = None
 
             # Find relevant sections first (needed for title extraction)
-            for section in root.findall(".//section"):
-                code_elem = section.find("./code")
+            for section in root.iter(SECTION_TAG):
+                code_elem = section.find(CODE_TAG)
                 if code_elem is not None:
                     code = code_elem.get("code")
                     if code == "48780-1": # "SPL product data elements section"
@@ -467,51 +772,65 @@ class DailyMedAPI:
                     elif code == "51727-6": # "INACTIVE INGREDIENT SECTION"
                         inactive_section = section
 
+            # Locate the product's name and form once; same result as
+            # data_section.find(".//manufacturedProduct/name") without the XPath walker
+            product_name_elem = None
+            form_code_elem = None
+            if data_section is not None:
+                for product in data_section.iter(MANUFACTURED_PRODUCT_TAG):
+                    if product_name_elem is None:
+                        product_name_elem = product.find(NAME_TAG)
+                    if form_code_elem is None:
+                        form_code_elem = product.find(FORM_CODE_TAG)
+                    if product_name_elem is not None and form_code_elem is not None:
+                        break
+
             # Find Title - try multiple sources
             title_text = None
             
             # First, try to find the product name in the manufacturedProduct section
             if data_section is not None:
-                product_name_elem = data_section.find(".//manufacturedProduct/name")
                 if product_name_elem is not None:
-                    title_text = " ".join(str(product_name_elem.text).split()).strip() if product_name_elem.text else None
+                    title_text = _ws(product_name_elem.text) or None
                     if not title_text:
-                        title_text = " ".join("".join(product_name_elem.itertext()).split()).strip()
+                        title_text = _ws("".join(product_name_elem.itertext()))
             
             # Fallback to document title if product name not found
             if not title_text:
-                title_elem = root.find(".//title")
+                title_elem = root.find(".//title", SPL_NS)
                 if title_elem is not None:
                     # Remove extra whitespace/newlines from title
-                    title_text = " ".join(str(title_elem.text).split()).strip()
+                    title_text = _ws(title_elem.text)
                     if not title_text:
                         # Fallback for complex titles with <sup> tags etc.
-                        title_text = " ".join("".join(title_elem.itertext()).split()).strip()
+                        title_text = _ws("".join(title_elem.itertext()))
                     
                     # If title is just "Drug Facts", try to find a better name
                     if title_text and title_text.lower() in ["drug facts", "drug facts label"]:
                         # Try to find product name in data_section
                         if data_section is not None:
-                            product_elem = data_section.find(".//manufacturedProduct/name")
+                            product_elem = product_name_elem
                             if product_elem is not None:
-                                product_text = " ".join("".join(product_elem.itertext()).split()).strip()
+                                product_text = _ws("".join(product_elem.itertext()))
                                 if product_text:
                                     title_text = product_text
                             else:
                                 # Try to construct from active ingredients
                                 active_names = []
-                                for ingredient in data_section.findall(".//ingredient[@classCode='ACTIB']"):
+                                for ingredient in data_section.iter(INGREDIENT_TAG):
+                                    if ingredient.get("classCode") != "ACTIB":
+                                        continue
                                     # Try multiple methods to get name
                                     name = None
-                                    name_elem = ingredient.find(".//ingredientSubstance/name")
+                                    name_elem = ingredient.find(".//ingredientSubstance/name", SPL_NS)
                                     if name_elem is not None and name_elem.text:
                                         name = name_elem.text.strip()
                                     if not name:
-                                        active_moiety = ingredient.find(".//activeMoiety/activeMoiety/name")
+                                        active_moiety = ingredient.find(".//activeMoiety/activeMoiety/name", SPL_NS)
                                         if active_moiety is not None and active_moiety.text:
                                             name = active_moiety.text.strip()
                                     if not name:
-                                        code_elem = ingredient.find(".//ingredientSubstance/code")
+                                        code_elem = ingredient.find(".//ingredientSubstance/code", SPL_NS)
                                         if code_elem is not None:
                                             name = code_elem.get("displayName")
                                             if name:
@@ -522,9 +841,9 @@ class DailyMedAPI:
                                     title_text = " / ".join(active_names)
                         else:
                             # Try to find product name anywhere in the document
-                            product_elem = root.find(".//manufacturedProduct/name")
+                            product_elem = root.find(".//manufacturedProduct/name", SPL_NS)
                             if product_elem is not None:
-                                product_text = " ".join("".join(product_elem.itertext()).split()).strip()
+                                product_text = _ws("".join(product_elem.itertext()))
                                 if product_text:
                                     title_text = product_text
             
@@ -537,7 +856,7 @@ class DailyMedAPI:
                 strength = "Strength not specified"
 
                 # 1. Try standard ingredientSubstance/name
-                name_elem = ingredient.find(".//ingredientSubstance/name")
+                name_elem = ingredient.find(".//ingredientSubstance/name", SPL_NS)
                 if name_elem is not None and name_elem.text:
                     name = name_elem.text.strip()
                 
@@ -545,7 +864,7 @@ class DailyMedAPI:
                 if not name:
                     # Try multiple activeMoiety paths
                     for path in [".//activeMoiety/activeMoiety/name", ".//activeMoiety/name", ".//activeIngredient/name"]:
-                        active_moiety = ingredient.find(path)
+                        active_moiety = ingredient.find(path, SPL_NS)
                         if active_moiety is not None and active_moiety.text:
                             name = active_moiety.text.strip()
                             break
@@ -553,7 +872,7 @@ class DailyMedAPI:
                 # 3. Try displayName attribute on code elements
                 if not name:
                     for code_path in [".//ingredientSubstance/code", ".//code", ".//activeIngredientSubstance/code"]:
-                        code_elem = ingredient.find(code_path)
+                        code_elem = ingredient.find(code_path, SPL_NS)
                         if code_elem is not None:
                             disp_name = code_elem.get("displayName")
                             if disp_name:
@@ -562,18 +881,18 @@ class DailyMedAPI:
                 
                 # 4. Try name element directly under ingredient
                 if not name:
-                    direct_name = ingredient.find("./name")
+                    direct_name = ingredient.find(NAME_TAG)
                     if direct_name is not None and direct_name.text:
                         name = direct_name.text.strip()
 
                 # Extract Strength from multiple possible locations
-                numerator = ingredient.find(".//quantity/numerator")
+                numerator = ingredient.find(".//quantity/numerator", SPL_NS)
                 if numerator is None:
-                    numerator = ingredient.find(".//numerator")
+                    numerator = ingredient.find(".//numerator", SPL_NS)
                 
-                denominator = ingredient.find(".//quantity/denominator")
+                denominator = ingredient.find(".//quantity/denominator", SPL_NS)
                 if denominator is None:
-                    denominator = ingredient.find(".//denominator")
+                    denominator = ingredient.find(".//denominator", SPL_NS)
                 
                 if numerator is not None:
                     val = numerator.get('value', '')
@@ -594,25 +913,25 @@ class DailyMedAPI:
             def extract_inactive_name(ingredient):
                 """Extract name from inactive ingredient element"""
                 # Check ingredientSubstance name
-                name_elem = ingredient.find(".//ingredientSubstance/name")
+                name_elem = ingredient.find(".//ingredientSubstance/name", SPL_NS)
                 if name_elem is not None and name_elem.text:
                     return name_elem.text.strip().upper()
                 
                 # Check inactiveIngredientSubstance name
-                name_elem = ingredient.find(".//inactiveIngredientSubstance/name")
+                name_elem = ingredient.find(".//inactiveIngredientSubstance/name", SPL_NS)
                 if name_elem is not None and name_elem.text:
                     return name_elem.text.strip().upper()
                 
                 # Check code displayName as fallback
                 for code_path in [".//ingredientSubstance/code", ".//code", ".//inactiveIngredientSubstance/code"]:
-                    code_elem = ingredient.find(code_path)
+                    code_elem = ingredient.find(code_path, SPL_NS)
                     if code_elem is not None:
                         disp = code_elem.get("displayName")
                         if disp:
                             return disp.strip().upper()
                 
                 # Check name directly under ingredient
-                name_elem = ingredient.find("./name")
+                name_elem = ingredient.find(NAME_TAG)
                 if name_elem is not None and name_elem.text:
                     return name_elem.text.strip().upper()
                 
@@ -625,27 +944,35 @@ class DailyMedAPI:
                 # ACTI - Active Ingredient
                 # ACTIM - Active Ingredient Manufactured Item (common in generics like Duloxetine)
                 # ACTIR - Active Ingredient Reference
-                for class_code in ['ACTIB', 'ACTI', 'ACTIM', 'ACTIR']:
-                    for ingredient in search_root.findall(f".//ingredient[@classCode='{class_code}']"):
+                # One pass over the ingredients, bucketed by class code so actives keep
+                # the ACTIB, ACTI, ACTIM, ACTIR order of the former per-code sweeps
+                actives_by_code = {class_code: [] for class_code in ACTIVE_CLASS_CODES}
+                for ingredient in search_root.iter(INGREDIENT_TAG):
+                    if ingredient is search_root:
+                        continue
+                    class_code = ingredient.get("classCode")
+                    if class_code in actives_by_code:
+                        actives_by_code[class_code].append(ingredient)
+                    elif class_code == "IACT":
+                        # IACT (Inactive Ingredient)
+                        name = extract_inactive_name(ingredient)
+                        if name:
+                            inactive_ingredients_set.add(name)
+
+                for class_code in ACTIVE_CLASS_CODES:
+                    for ingredient in actives_by_code[class_code]:
                         name, strength = extract_ingredient_info(ingredient)
                         if name:
-                            active_ingredients_list.append({'name': name.title(), 'strength': strength})
-                
-                # Search for IACT (Inactive Ingredient)
-                for ingredient in search_root.findall(".//ingredient[@classCode='IACT']"):
-                    name = extract_inactive_name(ingredient)
-                    if name:
-                        inactive_ingredients_set.add(name)
+                            active_ingredients_list.append({'name': sys.intern(name.title()), 'strength': sys.intern(strength)})
             # --- END HELPER FUNCTIONS ---
 
             if data_section is not None:
-                # Find Form Code
-                form_code_elem = data_section.find(".//manufacturedProduct/formCode")
+                # Find Form Code (located alongside the product name above)
                 if form_code_elem is not None:
                     parsed_data["form_code_display"] = form_code_elem.get("displayName", "N/A")
 
                 # Find Route Code
-                route_code_elem = data_section.find(".//substanceAdministration/routeCode")
+                route_code_elem = data_section.find(".//substanceAdministration/routeCode", SPL_NS)
                 if route_code_elem is not None:
                     parsed_data["route_code_display"] = route_code_elem.get("displayName", "N/A")
                 
@@ -659,22 +986,22 @@ class DailyMedAPI:
                 
                 # Additional fallback: Look for asContent/containerPackagedProduct structure
                 if not active_ingredients:
-                    for content in root.findall(".//asContent"):
+                    for content in root.findall(".//asContent", SPL_NS):
                         search_ingredients_in_element(content, active_ingredients, inactive_ingredients_structured)
                 
                 # Final fallback: Search for any subjectOf/substanceAdministration with active ingredients
                 if not active_ingredients:
-                    for subst_admin in root.findall(".//subjectOf/substanceAdministration"):
+                    for subst_admin in root.findall(".//subjectOf/substanceAdministration", SPL_NS):
                         search_ingredients_in_element(subst_admin, active_ingredients, inactive_ingredients_structured)
                 # --- ACTIVE INGREDIENT PARSING END ---
             else:
                 # No data_section found, search the entire document
                 # Try to find Form Code and Route Code from root
-                form_code_elem = root.find(".//manufacturedProduct/formCode")
+                form_code_elem = root.find(".//manufacturedProduct/formCode", SPL_NS)
                 if form_code_elem is not None:
                     parsed_data["form_code_display"] = form_code_elem.get("displayName", "N/A")
                 
-                route_code_elem = root.find(".//substanceAdministration/routeCode")
+                route_code_elem = root.find(".//substanceAdministration/routeCode", SPL_NS)
                 if route_code_elem is not None:
                     parsed_data["route_code_display"] = route_code_elem.get("displayName", "N/A")
                 
@@ -683,20 +1010,19 @@ class DailyMedAPI:
                 
                 # Additional fallback paths
                 if not active_ingredients:
-                    for content in root.findall(".//asContent"):
+                    for content in root.findall(".//asContent", SPL_NS):
                         search_ingredients_in_element(content, active_ingredients, inactive_ingredients_structured)
                 
                 if not active_ingredients:
-                    for subst_admin in root.findall(".//subjectOf/substanceAdministration"):
+                    for subst_admin in root.findall(".//subjectOf/substanceAdministration", SPL_NS):
                         search_ingredients_in_element(subst_admin, active_ingredients, inactive_ingredients_structured)
             
             # Find Human-Readable Inactive Ingredients (Fallback)
             if inactive_section is not None:
-                para_texts = []
-                for para in inactive_section.findall(".//paragraph"):
-                    text = "".join(para.itertext()).strip()
-                    if text:
-                        para_texts.append(text)
+                para_texts = [
+                    text for text in ("".join(para.itertext()).strip() for para in inactive_section.iter(PARAGRAPH_TAG))
+                    if text
+                ]
                 
                 if para_texts:
                     full_text = " ".join(para_texts).lower()
@@ -707,23 +1033,33 @@ class DailyMedAPI:
                             full_text = full_text[len(p):].strip()
                     full_text = full_text.strip(".: ")
                     
-                    ingredients_list = full_text.split(',')
-                    for item in ingredients_list:
-                        clean_item = item.strip().upper()
-                        # Basic cleanup of common noise words
-                        if clean_item and "CONTAINS" not in clean_item:
-                            inactive_ingredients_text.add(clean_item)
-
-            # Combine and title-case ingredients
+                    # Basic cleanup of common noise words
+                    inactive_ingredients_text.update(
+                        item for item in map(str.strip, full_text.upper().split(','))
+                        if item and "CONTAINS" not in item
+                    )
+
+            # Combine and title-case ingredients. Names are interned because the same excipients
+            # recur across thousands of labels, so cached SPLs share one copy of each string.
+            # The read-only lists are tuples of str, which deepcopy() returns as-is on cache hits
             parsed_data["active"] = active_ingredients
             combined_inactive = inactive_ingredients_structured.union(inactive_ingredients_text)
-            parsed_data["inactive"] = sorted([item.title() for item in combined_inactive if item]) 
+            parsed_data["inactive"] = tuple(sorted(sys.intern(item.title()) for item in combined_inactive if item))
+
+            # Lowercase copies for search_with_filters, computed once per document (and cached
+            # with it) instead of re-casing every name on every search
+            parsed_data["active_lower"] = tuple(ing["name"].lower() for ing in active_ingredients)
+            parsed_data["inactive_lower"] = tuple(item.lower() for item in parsed_data["inactive"])
 
             return parsed_data
 
         except ET.ParseError as e:
             print(f"Failed to parse XML: {e}", file=sys.stderr)
             return None
+        except (requests.exceptions.RequestException, Urllib3HTTPError):
+            # A download that failed while being parsed, not a bad document: let the
+            # caller report it (and never cache it as a parse result)
+            raise
         except Exception as e:
             import traceback
             print(f"An unexpected error occurred during XML parsing: {e}", file=sys.stderr)
@@ -744,14 +1080,10 @@ class DailyMedAPI:
         print(f"\nFetching SPL for SET ID: {set_id} to parse ingredients...")
         
         try:
-            xml_string = self._make_request(f"spls/{set_id}.xml", params=None)
-            if not isinstance(xml_string, str):
-                raise ValueError("Failed to fetch XML, API did not return string.")
+            parsed_data = self._fetch_and_parse_spl_xml(set_id)
         except requests.exceptions.RequestException as e:
             print(f"Failed to fetch SPL XML: {e}", file=sys.stderr)
             raise 
-
-        parsed_data = self._parse_spl_xml(xml_string)
         
         if parsed_data:
             # Return only the ingredient parts for this function
@@ -759,12 +1091,113 @@ class DailyMedAPI:
         else:
             raise ValueError(f"Failed to parse XML for SET ID {set_id}")
 
+    def _get_cached_spl(self, key: tuple) -> Optional[Dict[str, Any]]:
+        """Returns a copy of a cached parsed SPL (memory first, then disk), or None on a miss."""
+        with self._spl_cache_lock:
+            parsed_data = self._spl_cache.get(key)
+            if parsed_data is not None:
+                self._spl_cache.move_to_end(key)
+            elif self._spl_store is not None:
+                # Stored as (stored_at, parsed_data); older plain entries are ignored
+                entry = self._spl_store.get(f"{key[0]}:{key[1]}")
+                if isinstance(entry, tuple) and time.time() - entry[0] <= self.SPL_STORE_MAX_AGE:
+                    parsed_data = entry[1]
+                    self._remember_spl(key, parsed_data)
+        # Callers (e.g. the web views) mutate results in place, so never hand out the cached object
+        return copy.deepcopy(parsed_data) if parsed_data is not None else None
+
+    def _store_cached_spl(self, key: tuple, parsed_data: Dict[str, Any]):
+        """Stores a parsed SPL in the memory cache and, if enabled, the persistent cache."""
+        parsed_data = copy.deepcopy(parsed_data)
+        with self._spl_cache_lock:
+            self._remember_spl(key, parsed_data)
+            if self._spl_store is not None:
+                self._spl_store[f"{key[0]}:{key[1]}"] = (time.time(), parsed_data)
+
+    def _remember_spl(self, key: tuple, parsed_data: Dict[str, Any]):
+        """Adds an entry to the in-memory LRU. Caller must hold _spl_cache_lock."""
+        self._spl_cache[key] = parsed_data
+        self._spl_cache.move_to_end(key)
+        if len(self._spl_cache) > self.SPL_CACHE_SIZE:
+            self._spl_cache.popitem(last=False)
+
+    def _fetch_parsed_spl(self, set_id: str, version: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetches and parses a single SPL XML. Runs on worker threads in search_with_filters.
+
+        Args:
+            set_id: The SET ID of the SPL document.
+            version: The SPL version (or published date) from the search results. When given,
+                the parsed result is cached under (set_id, version) so later searches skip
+                both the download and the parse; a new version is simply a cache miss.
+                Concurrent calls for the same (set_id, version) share a single download.
+
+        Returns:
+            The parsed SPL dictionary, or None if the XML could not be fetched or parsed.
+        """
+        key = (set_id, version)
+        if version is None:
+            return self._fetch_and_parse_spl_xml(set_id)
+
+        cached = self._get_cached_spl(key)
+        if cached is not None:
+            return cached
+
+        # Collapse duplicate in-flight requests (the same SPL listed on two pages, or two
+        # searches sharing this client): the first caller fetches, later ones wait for it
+        with self._spl_cache_lock:
+            inflight = self._inflight_spls.get(key)
+            if inflight is None:
+                inflight = self._inflight_spls[key] = Future()
+                is_owner = True
+            else:
+                is_owner = False
+
+        if not is_owner:
+            # Re-read through the cache so every caller gets its own copy
+            return self._get_cached_spl(key) if inflight.result() else None
+
+        try:
+            parsed_data = self._fetch_and_parse_spl_xml(set_id)
+            if parsed_data:
+                self._store_cached_spl(key, parsed_data)
+            inflight.set_result(parsed_data is not None)
+        except BaseException as e:
+            inflight.set_exception(e)
+            raise
+        finally:
+            with self._spl_cache_lock:
+                del self._inflight_spls[key]
+        return parsed_data
+
     def search_with_filters(
         self,
-        args: argparse.Namespace
+        args: argparse.Namespace,
+        keep_inactive_lower: bool = False
     ) -> Generator[Dict[str, Any], None, None]:
         """
         Performs a search across ALL pages, extracting and filtering results.
+
+        With keep_inactive_lower, each result keeps its "inactive_lower" tuple (the inactive
+        names lowercased, in the same order) for callers that match on them too.
+        """
+        batches = self.search_with_filters_batched(args, keep_inactive_lower)
+        try:
+            for batch in batches:
+                yield from batch
+        finally:
+            # Stop the pipeline (and its queued downloads) if the caller stops early
+            batches.close()
+
+    def search_with_filters_batched(
+        self,
+        args: argparse.Namespace,
+        keep_inactive_lower: bool = False
+    ) -> Generator[List[Dict[str, Any]], None, None]:
+        """
+        Same search as search_with_filters, but yields the matches in the groups they become
+        available (SPLs that finished downloading together), so a caller writing them out
+        can do so in one write per group without holding any match back.
         """
         # Extract arguments
         drug_name = getattr(args, 'drug_name', None)
@@ -772,6 +1205,8 @@ class DailyMedAPI:
         ndc = getattr(args, 'ndc', None)
         setid = getattr(args, 'setid', None)
         drug_class_code = getattr(args, 'drug_class_code', None)
+        # Narrows the listing upstream, so far fewer SPLs have to be fetched and filtered here
+        unii_code = getattr(args, 'unii_code', None)
         
         # Max results per request (API usually limits this to 100 regardless of what we ask for)
         # We will loop until we have everything.
@@ -816,149 +1251,264 @@ class DailyMedAPI:
         inc_inact = {k.lower() for k in include_inactive} if include_inactive else set()
         exc_inact = {k.lower() for k in exclude_inactive} if exclude_inactive else set()
 
+        # "Any keyword" checks run as one compiled regex scan instead of a Python-level
+        # keyword x ingredient double loop
+        form_re = _keyword_pattern(form_filter)
+        only_act_re = _keyword_pattern(only_act_filts)
+        exc_act_re = _keyword_pattern(exc_act)
+        exc_inact_re = _keyword_pattern(exc_inact)
+
+        # Skip building the lowercase ingredient strings entirely when no filter reads them
+        has_active_filters = bool(inc_act or exc_act_re or only_act_re)
+        has_inactive_filters = bool(inc_inact or exc_inact_re)
+
+        def passes_filters(parsed_data: Dict[str, Any]) -> bool:
+            # Check Route
+            if route_filter:
+                parsed_route = parsed_data.get("route_code_display", "").lower()
+                if route_filter not in parsed_route:
+                    return False
+
+            # Check Form
+            if form_re:
+                parsed_form = parsed_data.get("form_code_display", "").lower()
+                if not form_re.search(parsed_form):
+                    return False
+
+            # Check active ingredients. Names are lowercased once and joined so each
+            # keyword is a single substring scan (newlines keep matches inside one name)
+            if has_active_filters:
+                active_list_lower = parsed_data.get("active_lower")
+                if active_list_lower is None: # Parsed before active_lower existed (persistent cache)
+                    active_list_lower = [ing["name"].lower() for ing in parsed_data["active"]]
+                actives_joined = "\n".join(active_list_lower)
+
+                # Check Include Active
+                if inc_act and not all(filt in actives_joined for filt in inc_act):
+                    return False
+
+                # Check Exclude Active
+                if exc_act_re and exc_act_re.search(actives_joined):
+                    return False
+
+                # Check Only Active
+                if only_act_re and not all(only_act_re.search(ing) for ing in active_list_lower):
+                    return False
+
+            # Check inactive ingredients (only the joined string is needed)
+            if has_inactive_filters:
+                inactive_lower = parsed_data.get("inactive_lower")
+                if inactive_lower is not None:
+                    inactives_joined = "\n".join(inactive_lower)
+                else:
+                    inactives_joined = "\n".join(parsed_data["inactive"]).lower()
+
+                # Check Include Inactive
+                if inc_inact and not all(filt in inactives_joined for filt in inc_inact):
+                    return False
+
+                # Check Exclude Inactive
+                if exc_inact_re and exc_inact_re.search(inactives_joined):
+                    return False
+
+            return True
+
+        def worth_fetching(item: Dict[str, Any]) -> bool:
+            # Push the form filter down to the search listing: spls.json titles are generated as
+            # "NAME (GENERIC) FORM [LABELER]", so a title that names a dosage form but none of
+            # the requested ones cannot pass the form check and its XML download is skipped.
+            # Kit and multi-product titles don't always name a form; those are still fetched.
+            # Route and ingredients are not in the listing.
+            if form_re and item.get("title"):
+                title = item["title"].lower()
+                return form_re.search(title) is not None or _DOSAGE_FORM_RE.search(title) is None
+            return True
+
+        def fetch_page(page: int) -> Optional[Dict[str, Any]]:
+            # Fetch a page of results (priority: setid > ndc > rxcui > drug_class_code > drug_name)
+            if setid:
+                return self.search_spls(setid=setid, unii_code=unii_code, pagesize=request_pagesize, page=page)
+            elif ndc:
+                return self.search_spls(ndc=ndc, unii_code=unii_code, pagesize=request_pagesize, page=page)
+            elif rxcui:
+                return self.search_spls(rxcui=rxcui, unii_code=unii_code, pagesize=request_pagesize, page=page)
+            elif drug_class_code:
+                return self.search_spls(drug_class_code=drug_class_code, unii_code=unii_code, pagesize=request_pagesize, page=page)
+            elif drug_name:
+                return self.search_spls(drug_name=drug_name, unii_code=unii_code, pagesize=request_pagesize, page=page)
+            return None # Should not happen based on calling code
+
         total_processed = 0
         total_matched = 0
 
-        # --- PAGINATION LOOP ---
-        while True:
-            try:
-                # Fetch a page of results (priority: setid > ndc > rxcui > drug_class_code > drug_name)
-                if setid:
-                    response = self.search_spls(setid=setid, pagesize=request_pagesize, page=current_page)
-                elif ndc:
-                    response = self.search_spls(ndc=ndc, pagesize=request_pagesize, page=current_page)
-                elif rxcui:
-                    response = self.search_spls(rxcui=rxcui, pagesize=request_pagesize, page=current_page)
-                elif drug_class_code:
-                    response = self.search_spls(drug_class_code=drug_class_code, pagesize=request_pagesize, page=current_page)
-                elif drug_name:
-                    response = self.search_spls(drug_name=drug_name, pagesize=request_pagesize, page=current_page)
-                else:
-                    break # Should not happen based on calling code
-                
-                data_results = response.get("data", [])
-                metadata = response.get("metadata", {})
-                
-                if not data_results:
-                    break # No more results
-
-                # Process this batch
-                for item in data_results:
-                    set_id = item.get("setid")
-                    if not set_id:
+        # Downloads and parses run on a small thread pool as one pipeline across pages:
+        # the next page listing is requested as soon as the current one arrives, and
+        # SPLs are fed to the pool from a backlog so workers never idle at page boundaries.
+        # Only `window` SPLs are in flight at once, which bounds memory and lets the
+        # next page request jump ahead of the remaining backlog.
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        window = self.max_workers * 2
+        backlog = deque()
+        pending = {}
+        page_future = executor.submit(fetch_page, current_page)
+
+        # --- PIPELINE LOOP ---
+        try:
+            while page_future is not None or backlog or pending:
+                # Take in the page listing once it has arrived (or block on it when idle)
+                if page_future is not None and (page_future.done() or not (backlog or pending)):
+                    try:
+                        response = page_future.result()
+                    except requests.exceptions.RequestException as e:
+                        print(f"API search failed on page {current_page}: {e}", file=sys.stderr)
+                        response = None
+                    page_future = None
+
+                    data_results = response.get("data", []) if response else []
+                    if data_results:
+                        metadata = response.get("metadata", {})
+                        backlog.extend(item for item in data_results if item.get("setid") and worth_fetching(item))
+                        total_processed += len(data_results)
+
+                        # Check pagination
+                        total_pages = int(metadata.get("total_pages", 0))
+                        current_page_num = int(metadata.get("current_page", current_page))
+
+                        print(f"Processed page {current_page_num} of {total_pages}", file=sys.stderr)
+
+                        if current_page_num < total_pages:
+                            current_page += 1 # Prefetch the next page while this one downloads
+                            page_future = executor.submit(fetch_page, current_page)
+
+                # Keep the pool busy up to the in-flight window
+                while backlog and len(pending) < window:
+                    item = backlog.popleft()
+                    future = executor.submit(
+                        self._fetch_parsed_spl,
+                        item["setid"],
+                        item.get("spl_version") or item.get("published_date")
+                    )
+                    pending[future] = item["setid"]
+
+                if not pending:
+                    continue
+
+                # Filter each SPL as soon as its download and parse complete
+                waiting_on = list(pending)
+                if page_future is not None:
+                    waiting_on.append(page_future)
+                done, _ = wait(waiting_on, return_when=FIRST_COMPLETED)
+
+                matches = []
+                for future in done:
+                    if future is page_future:
                         continue
-                    
+                    set_id = pending.pop(future)
                     try:
-                        # Fetch and parse XML
-                        xml_string = self._make_request(f"spls/{set_id}.xml", params=None)
-                        if not isinstance(xml_string, str):
-                            continue
-                        
-                        parsed_data = self._parse_spl_xml(xml_string)
-                        if not parsed_data:
-                            continue
-                        
-                        # --- Filtering Logic ---
-                        
-                        # Check Route
-                        if route_filter:
-                            parsed_route = parsed_data.get("route_code_display", "").lower()
-                            if route_filter not in parsed_route:
-                                continue
-
-                        # Check Form
-                        if form_filter:
-                            parsed_form = parsed_data.get("form_code_display", "").lower()
-                            if not any(filt in parsed_form for filt in form_filter):
-                                continue
-
-                        # Prepare lowercase ingredient lists
-                        active_list_lower = {ing["name"].lower() for ing in parsed_data["active"]}
-                        inactive_list_lower = {ing.lower() for ing in parsed_data["inactive"]}
-                        
-                        # Check Include Active
-                        if inc_act and not all(any(filt in active for active in active_list_lower) for filt in inc_act):
-                            continue
-                        
-                        # Check Exclude Active
-                        if exc_act and any(any(filt in active for active in active_list_lower) for filt in exc_act):
-                            continue
-
-                        # Check Include Inactive
-                        if inc_inact and not all(any(filt in inactive for inactive in inactive_list_lower) for filt in inc_inact):
-                            continue
-
-                        # Check Exclude Inactive
-                        if exc_inact and any(any(filt in inactive for inactive in inactive_list_lower) for filt in exc_inact):
-                            continue
-                        
-                        # Check Only Active
-                        if only_act_filts and not all(any(filt in ing for filt in only_act_filts) for ing in active_list_lower):
-                            continue 
-
-                        # Yield match
-                        total_matched += 1
-                        yield parsed_data
-
+                        parsed_data = future.result()
+                        if parsed_data and passes_filters(parsed_data):
+                            # The lowercase lists are only for filtering; keep results as before
+                            parsed_data.pop("active_lower", None)
+                            if not keep_inactive_lower:
+                                parsed_data.pop("inactive_lower", None)
+                            elif "inactive_lower" not in parsed_data: # Parsed before it existed
+                                parsed_data["inactive_lower"] = tuple(item.lower() for item in parsed_data["inactive"])
+
+                            total_matched += 1
+                            matches.append(parsed_data)
                     except Exception as e:
                         print(f"    [ERROR] Failed to process SET ID {set_id}: {e}", file=sys.stderr)
                         continue
-                
-                total_processed += len(data_results)
-                
-                # Check pagination
-                total_pages = int(metadata.get("total_pages", 0))
-                current_page_num = int(metadata.get("current_page", current_page))
-                
-                print(f"Processed page {current_page_num} of {total_pages}", file=sys.stderr)
-                
-                if current_page_num >= total_pages:
-                    break # Reached the end
-                
-                current_page += 1 # Move to next page
 
-            except requests.exceptions.RequestException as e:
-                print(f"API search failed on page {current_page}: {e}", file=sys.stderr)
-                break
-        
+                # Yield matches
+                if matches:
+                    yield matches
+        finally:
+            # Cancel any queued downloads if the caller stops iterating early
+            executor.shutdown(wait=False, cancel_futures=True)
+
         print(f"\nSearch complete. Processed {total_processed} items, found {total_matched} matches.")
 
 
 def pretty_print_json(data: Dict[str, Any]):
     """Helper function to print JSON data in an indented, readable format."""
-    print(json.dumps(data, indent=2))
+    stdout_buffer = getattr(sys.stdout, "buffer", None)
+    if orjson and stdout_buffer is not None:
+        # orjson produces UTF-8 bytes; flush pending text output first to keep ordering
+        sys.stdout.flush()
+        stdout_buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2) + b"\n")
+        stdout_buffer.flush()
+    else:
+        print(json.dumps(data, indent=2))
 
-def print_ingredients(data: Dict[str, Any]):
-    """Helper function to print ingredients in a readable format."""
+def print_ingredients(data: Dict[str, Any], file: Optional[TextIO] = None):
+    """Helper function to print ingredients in a readable format (to stdout unless file is given)."""
     if not data.get('active') and not data.get('inactive'):
-        print("No ingredient information could be parsed.")
+        print("No ingredient information could be parsed.", file=file)
         return
     
-    print("--- Active Ingredients ---")
+    print("--- Active Ingredients ---", file=file)
     if data.get('active'):
         for item in data['active']:
-            print(f"- {item['name']} ({item['strength']})")
+            print(f"- {item['name']} ({item['strength']})", file=file)
     else:
-        print("No active ingredients found or parsed.")
+        print("No active ingredients found or parsed.", file=file)
     
-    print("\n--- Inactive Ingredients / Excipients ---")
+    print("\n--- Inactive Ingredients / Excipients ---", file=file)
     if data.get('inactive'):
         for item in data['inactive']:
-            print(f"- {item}")
+            print(f"- {item}", file=file)
     else:
-        print("No inactive ingredients found or parsed.")
-
-def print_search_result(data: Dict[str, Any]):
-    """Helper function to print the detailed search result."""
-    print("\n==================================================")
-    print(f"Drug: {data.get('title', 'N/A')}")
-    print(f"Form: {data.get('form_code_display', 'N/A')}")
-    print(f"Route: {data.get('route_code_display', 'N/A')}")
-    print(f"SET ID: {data.get('set_id', 'N/A')}")
+        print("No inactive ingredients found or parsed.", file=file)
+
+def print_search_result(data: Dict[str, Any], file: Optional[TextIO] = None):
+    """Helper function to print the detailed search result (to stdout unless file is given)."""
+    print("\n==================================================", file=file)
+    print(f"Drug: {data.get('title', 'N/A')}", file=file)
+    print(f"Form: {data.get('form_code_display', 'N/A')}", file=file)
+    print(f"Route: {data.get('route_code_display', 'N/A')}", file=file)
+    print(f"SET ID: {data.get('set_id', 'N/A')}", file=file)
     
     # Reuse the ingredient printer
-    print_ingredients(data)
-    print("==================================================")
+    print_ingredients(data, file=file)
+    print("==================================================", file=file)
+
+# JSON commands that map straight onto a DailyMedAPI method:
+# command -> (method name, argparse dests passed through as keyword arguments)
+JSON_COMMANDS = {
+    "search-spls": ("search_spls", (
+        "page", "pagesize", "application_number", "boxed_warning", "dea_schedule_code", "doctype",
+        "drug_class_code", "drug_class_coding_system", "drug_name", "name_type", "labeler",
+        "manufacturer", "marketing_category_code", "ndc", "published_date",
+        "published_date_comparison", "rxcui", "setid", "unii_code",
+    )),
+    "get-spl-history": ("get_spl_history", ("set_id",)),
+    "get-spl-ndcs": ("get_spl_ndcs", ("set_id",)),
+    "get-spl-packaging": ("get_spl_packaging", ("set_id",)),
+    "get-drugnames": ("get_drug_names", ("page", "pagesize", "manufacturer", "name_type")),
+    "get-ndcs": ("get_ndcs", (
+        "page", "pagesize", "application_number", "labeler", "marketing_category_code", "setid",
+    )),
+    "get-drugclasses": ("get_drug_classes", (
+        "page", "pagesize", "drug_class_code", "drug_class_coding_system", "class_code_type",
+        "class_name", "unii_code",
+    )),
+    "get-uniis": ("get_uniis", (
+        "page", "pagesize", "active_moiety", "drug_class_code", "drug_class_coding_system",
+        "rxcui", "unii_code",
+    )),
+    "get-rxcuis": ("get_rxcuis", ("page", "pagesize", "rxcui", "rxstring", "rxtty")),
+}
+
+def _add_pagination(
+    parser: argparse.ArgumentParser,
+    default_size: int = 10,
+    page_help: str = "Page number of results.",
+    size_help: str = "Results per page (max 100)."
+):
+    """Adds the --page/--pagesize pair shared by the paginated subcommands."""
+    parser.add_argument("--page", type=int, default=1, help=page_help)
+    parser.add_argument("--pagesize", type=int, default=default_size, help=size_help)
 
 def main():
     """
@@ -972,11 +1522,16 @@ def main():
     )
     subparsers = parser.add_subparsers(dest="command", required=True, help="The API command to run")
 
+    # Cache options shared by every subcommand
+    cache_parser = argparse.ArgumentParser(add_help=False)
+    cache_parser.add_argument("--no-cache", action="store_true", help="Bypass the local response and SPL cache (~/.cache/dailymed; delete that directory to clear it).")
+    cache_parser.add_argument("--cache-ttl", type=float, default=DailyMedAPI.RESPONSE_CACHE_TTL, help="Seconds to reuse cached API responses (default: one day).")
+
     # --- NEW: search command ---
-    search_parser = subparsers.add_parser("search", help="Advanced search with post-filtering (slow, supports pagination).")
+    search_parser = subparsers.add_parser("search", parents=[cache_parser], help="Advanced search with post-filtering (slow, supports pagination).")
     search_parser.add_argument("--drug_name", type=str, required=True, help="Base drug name to search for (e.g., 'tylenol').")
-    search_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    search_parser.add_argument("--pagesize", type=int, default=25, help="Number of initial results to fetch and filter (max 100).")
+    _add_pagination(search_parser, default_size=25, size_help="Number of initial results to fetch and filter (max 100).")
+    search_parser.add_argument("--unii_code", type=str, help="Only consider SPLs containing this ingredient UNII; narrows the listing server-side before any filtering.")
     search_parser.add_argument("--route", type=str, help="Filter by route of administration (e.g., 'ORAL').")
     search_parser.add_argument("--form", nargs='+', help="Filter by dosage form (e.g., 'TABLET', 'CAPSULE').")
     search_parser.add_argument("--only-active", nargs='+', help="Ensure *only* active ingredients matching these keywords are present.")
@@ -984,11 +1539,11 @@ def main():
     search_parser.add_argument("--exclude-active", nargs='+', help="List of keywords that MUST NOT be in active ingredients.")
     search_parser.add_argument("--include-inactive", nargs='+', help="List of keywords that MUST be in inactive ingredients.")
     search_parser.add_argument("--exclude-inactive", nargs='+', help="List of keywords that MUST NOT be in inactive ingredients.")
+    search_parser.add_argument("--workers", type=int, default=8, help="Number of SPLs to download and parse concurrently (default: 8).")
 
     # --- search-spls command ---
-    spl_parser = subparsers.add_parser("search-spls", help="Search for SPLs (drug labels).")
-    spl_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    spl_parser.add_argument("--pagesize", type=int, default=25, help="Results per page (max 100).")
+    spl_parser = subparsers.add_parser("search-spls", parents=[cache_parser], help="Search for SPLs (drug labels).")
+    _add_pagination(spl_parser, default_size=25)
     spl_parser.add_argument("--application_number", type=str, help="Filter by NDA number.")
     
     # Correct way to handle boolean flags in argparse
@@ -1012,59 +1567,56 @@ def main():
 
 
     # --- get-spl command ---
-    get_spl_parser = subparsers.add_parser("get-spl", help="Get a specific SPL by its SET ID (raw XML).")
+    get_spl_parser = subparsers.add_parser("get-spl", parents=[cache_parser], help="Get a specific SPL by its SET ID (raw XML).")
     get_spl_parser.add_argument("set_id", type=str, help="The SET ID of the SPL.")
 
     # --- get-xmls command ---
-    get_xmls_parser = subparsers.add_parser("get-xmls", help="Search for SPLs and return all XML results. Searches by drug name or RxCUI and fetches all matching XML documents.")
+    get_xmls_parser = subparsers.add_parser("get-xmls", parents=[cache_parser], help="Search for SPLs and return all XML results. Searches by drug name or RxCUI and fetches all matching XML documents.")
     get_xmls_parser.add_argument("--drug_name", type=str, help="Drug name to search for (e.g., 'ibuprofen'). Either --drug_name or --rxcui must be provided.")
     get_xmls_parser.add_argument("--rxcui", type=str, help="RxNorm CUI to search for. Either --drug_name or --rxcui must be provided.")
-    get_xmls_parser.add_argument("--page", type=int, default=1, help="Starting page number (default: 1).")
-    get_xmls_parser.add_argument("--pagesize", type=int, default=100, help="Results per page (default: 100, max recommended).")
+    _add_pagination(get_xmls_parser, default_size=100, page_help="Starting page number (default: 1).", size_help="Results per page (default: 100, max recommended).")
+    get_xmls_parser.add_argument("--workers", type=int, default=8, help="Number of XML documents to download concurrently (default: 8).")
 
     # --- get-ingredients command ---
-    ingredients_parser = subparsers.add_parser("get-ingredients", help="Parse and list ingredients for an SPL.")
+    ingredients_parser = subparsers.add_parser("get-ingredients", parents=[cache_parser], help="Parse and list ingredients for an SPL.")
     ingredients_parser.add_argument("set_id", type=str, help="The SET ID of the SPL.")
 
     # --- get-spl-history command ---
-    history_parser = subparsers.add_parser("get-spl-history", help="Get the version history for an SPL.")
+    history_parser = subparsers.add_parser("get-spl-history", parents=[cache_parser], help="Get the version history for an SPL.")
     history_parser.add_argument("set_id", type=str, help="The SET ID of the SPL.")
 
     # --- get-spl-ndcs command ---
-    ndcs_parser = subparsers.add_parser("get-spl-ndcs", help="Get the NDCs for an SPL.")
+    ndcs_parser = subparsers.add_parser("get-spl-ndcs", parents=[cache_parser], help="Get the NDCs for an SPL.")
     ndcs_parser.add_argument("set_id", type=str, help="The SET ID of the SPL.")
     
     # --- get-spl-packaging command ---
-    pkg_parser = subparsers.add_parser("get-spl-packaging", help="Get the packaging information for an SPL.")
+    pkg_parser = subparsers.add_parser("get-spl-packaging", parents=[cache_parser], help="Get the packaging information for an SPL.")
     pkg_parser.add_argument("set_id", type=str, help="The SET ID of the SPL.")
 
     # --- Listing commands (drugnames, ndcs, drugclasses, uniis, rxcuis) ---
     
     # get-drugnames
-    drugnames_parser = subparsers.add_parser("get-drugnames", help="Get a list of all drugnames.")
-    drugnames_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    drugnames_parser.add_argument("--pagesize", type=int, default=10, help="Results per page (max 100).")
+    drugnames_parser = subparsers.add_parser("get-drugnames", parents=[cache_parser], help="Get a list of all drugnames.")
+    _add_pagination(drugnames_parser)
     drugnames_parser.add_argument("--manufacturer", type=str, help="Filter by manufacturer name.")
     drugnames_parser.add_argument("--name_type", type=str, help="Filter by name type ('g' for generic, 'b' for brand).")
     
     # get-drug-names (autocomplete suggestions)
-    drug_names_autocomplete_parser = subparsers.add_parser("get-drug-names", help="Get autocomplete suggestions for a drug name keyword (matches DailyMed website behavior).")
+    drug_names_autocomplete_parser = subparsers.add_parser("get-drug-names", parents=[cache_parser], help="Get autocomplete suggestions for a drug name keyword (matches DailyMed website behavior).")
     drug_names_autocomplete_parser.add_argument("keyword", type=str, help="Search keyword to get autocomplete suggestions for.")
     drug_names_autocomplete_parser.add_argument("--limit", type=int, default=20, help="Maximum number of suggestions to return (default: 20, max: 100).")
 
     # get-ndcs
-    ndcs_list_parser = subparsers.add_parser("get-ndcs", help="Get a list of all ndcs.")
-    ndcs_list_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    ndcs_list_parser.add_argument("--pagesize", type=int, default=10, help="Results per page (max 100).")
+    ndcs_list_parser = subparsers.add_parser("get-ndcs", parents=[cache_parser], help="Get a list of all ndcs.")
+    _add_pagination(ndcs_list_parser)
     ndcs_list_parser.add_argument("--application_number", type=str, help="Filter by NDA number.")
     ndcs_list_parser.add_argument("--labeler", type=str, help="Filter by labeler name.")
     ndcs_list_parser.add_argument("--marketing_category_code", type=str, help="Filter by marketing category.")
     ndcs_list_parser.add_argument("--setid", type=str, help="Filter by SPL SET ID.")
 
     # get-drugclasses
-    drugclasses_parser = subparsers.add_parser("get-drugclasses", help="Get a list of all drugclasses.")
-    drugclasses_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    drugclasses_parser.add_argument("--pagesize", type=int, default=10, help="Results per page (max 100).")
+    drugclasses_parser = subparsers.add_parser("get-drugclasses", parents=[cache_parser], help="Get a list of all drugclasses.")
+    _add_pagination(drugclasses_parser)
     drugclasses_parser.add_argument("--drug_class_code", type=str, help="Filter by drug class code.")
     drugclasses_parser.add_argument("--drug_class_coding_system", type=str, help="Coding system for drug_class_code.")
     drugclasses_parser.add_argument("--class_code_type", type=str, help="Filter by class code type (e.g., 'epc', 'moa').")
@@ -1072,9 +1624,8 @@ def main():
     drugclasses_parser.add_argument("--unii_code", type=str, help="Filter by UNII code.")
 
     # get-uniis
-    uniis_parser = subparsers.add_parser("get-uniis", help="Get a list of all uniis.")
-    uniis_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    uniis_parser.add_argument("--pagesize", type=int, default=10, help="Results per page (max 100).")
+    uniis_parser = subparsers.add_parser("get-uniis", parents=[cache_parser], help="Get a list of all uniis.")
+    _add_pagination(uniis_parser)
     uniis_parser.add_argument("--active_moiety", type=str, help="Filter by active moiety UNII code.")
     uniis_parser.add_argument("--drug_class_code", type=str, help="Filter by drug class code.")
     uniis_parser.add_argument("--drug_class_coding_system", type=str, help="Coding system for drug_class_code.")
@@ -1082,16 +1633,24 @@ def main():
     uniis_parser.add_argument("--unii_code", type=str, help="Filter by UNII code.")
 
     # get-rxcuis
-    rxcuis_parser = subparsers.add_parser("get-rxcuis", help="Get a list of all rxcuis.")
-    rxcuis_parser.add_argument("--page", type=int, default=1, help="Page number of results.")
-    rxcuis_parser.add_argument("--pagesize", type=int, default=10, help="Results per page (max 100).")
+    rxcuis_parser = subparsers.add_parser("get-rxcuis", parents=[cache_parser], help="Get a list of all rxcuis.")
+    _add_pagination(rxcuis_parser)
     rxcuis_parser.add_argument("--rxcui", type=str, help="Filter by a specific RxCUI.")
     rxcuis_parser.add_argument("--rxstring", type=str, help="Filter by a display name string (e.g., 'aspirin').")
     rxcuis_parser.add_argument("--rxtty", type=str, help="Filter by RxNorm term type (e.g., 'IN' for Ingredient).")
 
 
     args = parser.parse_args()
-    api = DailyMedAPI()
+    # Persist parsed SPLs and API responses between CLI runs so repeated commands skip the network
+    max_workers = getattr(args, "workers", 8)
+    if args.no_cache:
+        api = DailyMedAPI(max_workers=max_workers, cache_ttl=0)
+    else:
+        api = DailyMedAPI(
+            max_workers=max_workers,
+            cache_dir=os.path.join(os.path.expanduser("~"), ".cache", "dailymed"),
+            cache_ttl=args.cache_ttl
+        )
     
     try:
         # Handle non-JSON, non-looping commands first
@@ -1128,10 +1687,19 @@ def main():
         # Handle new 'search' command (looping)
         elif args.command == "search":
             results_found = 0
-            # search_with_filters will now print its own pagination
-            for result in api.search_with_filters(args):
-                results_found += 1
-                print_search_result(result)
+            # Each group of matches that arrives together is formatted into a buffer and written
+            # at once, so a long result list costs a handful of writes instead of ~20 print()
+            # calls each. Writing per group (not per N results) keeps the output in order with
+            # the pagination and summary lines the search prints itself.
+            buf = io.StringIO()
+            for batch in api.search_with_filters_batched(args):
+                for result in batch:
+                    results_found += 1
+                    print_search_result(result, file=buf)
+                sys.stdout.write(buf.getvalue())
+                sys.stdout.flush()
+                buf.seek(0)
+                buf.truncate()
             
             if results_found == 0:
                 print("\nNo results matched all of your advanced filters.")
@@ -1139,47 +1707,7 @@ def main():
         else:
             # Handle all other JSON-based commands
             result = None
-            if args.command == "search-spls":
-                result = api.search_spls(
-                    page=args.page, 
-                    pagesize=args.pagesize,
-                    application_number=args.application_number,
-                    boxed_warning=args.boxed_warning,
-                    dea_schedule_code=args.dea_schedule_code,
-                    doctype=args.doctype,
-                    drug_class_code=args.drug_class_code,
-                    drug_class_coding_system=args.drug_class_coding_system,
-                    drug_name=args.drug_name,
-                    name_type=args.name_type,
-                    labeler=args.labeler,
-                    manufacturer=args.manufacturer,
-                    marketing_category_code=args.marketing_category_code,
-                    ndc=args.ndc,
-                    published_date=args.published_date,
-                    published_date_comparison=args.published_date_comparison,
-                    rxcui=args.rxcui,
-                    setid=args.setid,
-                    unii_code=args.unii_code
-                )
-            
-            elif args.command == "get-spl-history":
-                result = api.get_spl_history(args.set_id)
-                
-            elif args.command == "get-spl-ndcs":
-                result = api.get_spl_ndcs(args.set_id)
-                
-            elif args.command == "get-spl-packaging":
-                result = api.get_spl_packaging(args.set_id)
-                
-            elif args.command == "get-drugnames":
-                result = api.get_drug_names(
-                    page=args.page, 
-                    pagesize=args.pagesize,
-                    manufacturer=args.manufacturer,
-                    name_type=args.name_type
-                )
-            
-            elif args.command == "get-drug-names":
+            if args.command == "get-drug-names":
                 # Get autocomplete suggestions for the keyword
                 limit = min(args.limit, 100)  # Cap at 100
                 result = api.get_drug_names(
@@ -1211,46 +1739,9 @@ def main():
                     "metadata": result.get("metadata", {})
                 }
                 
-            elif args.command == "get-ndcs":
-                result = api.get_ndcs(
-                    page=args.page, 
-                    pagesize=args.pagesize,
-                    application_number=args.application_number,
-                    labeler=args.labeler,
-                    marketing_category_code=args.marketing_category_code,
-                    setid=args.setid
-                )
-                
-            elif args.command == "get-drugclasses":
-                result = api.get_drug_classes(
-                    page=args.page, # Corrected from copy.page
-                    pagesize=args.pagesize,
-                    drug_class_code=args.drug_class_code,
-                    drug_class_coding_system=args.drug_class_coding_system,
-                    class_code_type=args.class_code_type,
-                    class_name=args.class_name,
-                    unii_code=args.unii_code
-                )
-                
-            elif args.command == "get-uniis":
-                result = api.get_uniis(
-                    page=args.page, 
-                    pagesize=args.pagesize,
-                    active_moiety=args.active_moiety,
-                    drug_class_code=args.drug_class_code,
-                    drug_class_coding_system=args.drug_class_coding_system,
-                    rxcui=args.rxcui,
-                    unii_code=args.unii_code
-                )
-            
-            elif args.command == "get-rxcuis":
-                result = api.get_rxcuis(
-                    page=args.page,
-                    pagesize=args.pagesize,
-                    rxcui=args.rxcui,
-                    rxstring=args.rxstring,
-                    rxtty=args.rxtty
-                )
+            elif args.command in JSON_COMMANDS:
+                method_name, arg_names = JSON_COMMANDS[args.command]
+                result = getattr(api, method_name)(**{name: getattr(args, name) for name in arg_names})
 
             if result:
                 print("API Response:")
@@ -1265,6 +1756,8 @@ def main():
     except Exception as e:
         print(f"\nAn unexpected error occurred: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        api.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -84,8 +84,17 @@ DATABASES = {
         'PASSWORD': config('RXNORM_DB_PASSWORD', default=''),
         'HOST': config('RXNORM_DB_HOST', default='mtm-1.ctomq2uaq1ps.us-west-2.rds.amazonaws.com'),
         'PORT': config('RXNORM_DB_PORT', default=5432, cast=int),
+        # Keep the connection across requests so each admin page doesn't pay for a
+        # fresh TCP/TLS handshake and auth round trip. Point RXNORM_DB_HOST/PORT at a
+        # PgBouncer transaction pool (e.g. 127.0.0.1:6432) to share them further.
+        'CONN_MAX_AGE': config('RXNORM_DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Server-side cursors don't survive PgBouncer transaction pooling
+        'DISABLE_SERVER_SIDE_CURSORS': config('RXNORM_DB_PGBOUNCER', default=False, cast=bool),
         'OPTIONS': {
             'options': '-c search_path=rxnorm',
+            'connect_timeout': 2,
+            'application_name': 'rxnorm-admin',
         },
     }
 }
@@ -147,6 +156,25 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Logging for the search app (request routing at INFO, failures with tracebacks).
+# Set SEARCH_LOG_LEVEL=WARNING in production to skip the per-request lines.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'search': {
+            'handlers': ['console'],
+            'level': config('SEARCH_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:8000",
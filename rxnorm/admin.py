@@ -1,73 +1,182 @@
+import functools
+import re
+
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.db.models import QuerySet
+from django.db.models.functions import Substr
 from django.db.utils import OperationalError
 from django.http import HttpResponse
 from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
 from .models import (
     Rxnatomarchive, Rxnconso, Rxncui, Rxncuichanges,
     Rxndoc, Rxnrel, Rxnsab, Rxnsat, Rxnsty
 )
 
+# Matches libpq's "connection to server ... failed" messages (host unreachable, refused, timeout)
+CONN_FAIL_RE = re.compile(r"connection to server.*failed", re.DOTALL)
+
+# Cache key and lifetime (seconds) for a detected RxNorm outage
+RXNORM_DOWN_CACHE_KEY = "rxnorm_db_down"
+RXNORM_DOWN_TTL = 30
+
+
+# Longest column rendered in full on a changelist. Wider text columns (multi-KB atom
+# strings, attribute values, source citations) are cut to TRUNCATED_CHARS characters
+LIST_DISPLAY_MAX_LENGTH = 200
+TRUNCATED_CHARS = 80
+
+
+# Unfiltered changelists of tables at least this large show Postgres' row estimate
+# instead of running COUNT(*) over the whole table
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+
+def _head_alias(field_name):
+    return f"{field_name}_head"
+
+
+def _truncated_column(field_name):
+    """A changelist column showing the start of a long text field."""
+    head_alias = _head_alias(field_name)
+
+    @admin.display(description=field_name, ordering=field_name)
+    def column(obj):
+        # Changelist rows carry only the first characters (see RxNormAdminMixin.get_queryset)
+        if head_alias in obj.__dict__:
+            value = obj.__dict__[head_alias]
+        else:
+            value = getattr(obj, field_name)
+        return Truncator(value or "").chars(TRUNCATED_CHARS)
+    column.field_name = field_name
+    return column
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that skips COUNT(*) on large, unfiltered RxNorm tables."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            connection = connections[queryset.db]
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                        [queryset.model._meta.db_table]
+                    )
+                    row = cursor.fetchone()
+                if row and row[0] >= ESTIMATED_COUNT_THRESHOLD:
+                    return row[0]
+        return super().count
+
+
+@functools.cache
+def _list_display(model):
+    """Changelist columns for a model (every field, long ones truncated), computed once per model."""
+    return tuple(
+        _truncated_column(f.name)
+        if isinstance(f, models.TextField) or (f.max_length or 0) > LIST_DISPLAY_MAX_LENGTH
+        else f.name
+        for f in model._meta.fields
+    )
+
+
 class RxNormAdminMixin:
     """Mixin to handle RxNorm database connection failures gracefully."""
+
+    paginator = EstimatedCountPaginator
+    # Filtered pages would otherwise run a second COUNT(*) for the "N total" link
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match is None or not match.url_name.endswith("_changelist"):
+            return queryset
+
+        # Fetch only the head of long text columns for the changelist instead of whole values
+        wide_fields = [column.field_name for column in self.list_display if hasattr(column, "field_name")]
+        if wide_fields:
+            queryset = queryset.defer(*wide_fields).annotate(**{
+                _head_alias(name): Substr(name, 1, TRUNCATED_CHARS + 1) for name in wide_fields
+            })
+        return queryset
     
     def changelist_view(self, request, extra_context=None):
+        # A recent connection failure is remembered for RXNORM_DOWN_TTL seconds so that page
+        # loads during an outage return the error page at once instead of each waiting out
+        # the connect timeout again
+        down_details = cache.get(RXNORM_DOWN_CACHE_KEY)
+        if down_details is not None:
+            return self._database_error_response(request, down_details)
+
         try:
             return super().changelist_view(request, extra_context)
         except OperationalError as e:
-            if "connection to server" in str(e) and "failed" in str(e):
+            if CONN_FAIL_RE.search(str(e)):
                 # Database connection failed - show friendly error message
-                context = {
-                    'title': 'RxNorm Database Unavailable',
-                    'error_message': 'The RxNorm database is currently unavailable. Please try again later.',
-                    'details': str(e),
-                    'opts': self.model._meta,
-                    'cl': None,
-                    'media': self.media,
-                }
-                return TemplateResponse(
-                    request,
-                    'admin/rxnorm_database_error.html',
-                    context,
-                    status=503
-                )
+                cache.set(RXNORM_DOWN_CACHE_KEY, str(e), RXNORM_DOWN_TTL)
+                return self._database_error_response(request, str(e))
             else:
                 # Re-raise other operational errors
                 raise
 
+    def _database_error_response(self, request, details):
+        context = {
+            'title': 'RxNorm Database Unavailable',
+            'error_message': 'The RxNorm database is currently unavailable. Please try again later.',
+            'details': details,
+            'opts': self.model._meta,
+            'cl': None,
+            'media': self.media,
+        }
+        return TemplateResponse(
+            request,
+            'admin/rxnorm_database_error.html',
+            context,
+            status=503
+        )
+
 @admin.register(Rxnatomarchive)
 class RxnatomarchiveAdmin(RxNormAdminMixin, admin.ModelAdmin):
     # show all fields in list display
-    list_display = [f.name for f in Rxnatomarchive._meta.fields]
+    list_display = _list_display(Rxnatomarchive)
 
 @admin.register(Rxnconso)
 class RxnconsoAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxnconso._meta.fields]
+    list_display = _list_display(Rxnconso)
 
 @admin.register(Rxncui)
 class RxncuiAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxncui._meta.fields]
+    list_display = _list_display(Rxncui)
 
 @admin.register(Rxncuichanges)
 class RxncuichangesAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxncuichanges._meta.fields]
+    list_display = _list_display(Rxncuichanges)
 
 @admin.register(Rxndoc)
 class RxndocAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxndoc._meta.fields]
+    list_display = _list_display(Rxndoc)
 
 @admin.register(Rxnrel)
 class RxnrelAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxnrel._meta.fields]
+    list_display = _list_display(Rxnrel)
 
 @admin.register(Rxnsab)
 class RxnsabAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxnsab._meta.fields]
+    list_display = _list_display(Rxnsab)
 
 @admin.register(Rxnsat)
 class RxnsatAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxnsat._meta.fields]
+    list_display = _list_display(Rxnsat)
 
 @admin.register(Rxnsty)
 class RxnstyAdmin(RxNormAdminMixin, admin.ModelAdmin):
-    list_display = [f.name for f in Rxnsty._meta.fields]
+    list_display = _list_display(Rxnsty)
 
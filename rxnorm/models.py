@@ -26,20 +26,20 @@ class Rxnatomarchive(models.Model):
 
 
 class Rxnconso(models.Model):
-    rxcui = models.CharField(max_length=8, blank=True, null=True)
+    rxcui = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     lat = models.CharField(max_length=3, blank=True, null=True)
     ts = models.CharField(max_length=1, blank=True, null=True)
     lui = models.CharField(max_length=8, blank=True, null=True)
     stt = models.CharField(max_length=3, blank=True, null=True)
     sui = models.CharField(max_length=8, blank=True, null=True)
     ispref = models.CharField(max_length=1, blank=True, null=True)
-    rxaui = models.CharField(max_length=8, blank=True, null=True)
+    rxaui = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     saui = models.CharField(max_length=50, blank=True, null=True)
     scui = models.CharField(max_length=50, blank=True, null=True)
     sdui = models.CharField(max_length=50, blank=True, null=True)
-    sab = models.CharField(max_length=20, blank=True, null=True)
-    tty = models.CharField(max_length=20, blank=True, null=True)
-    code = models.CharField(max_length=50, blank=True, null=True)
+    sab = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    tty = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    code = models.CharField(max_length=50, blank=True, null=True, db_index=True)
     str = models.CharField(max_length=3000, blank=True, null=True)
     srl = models.CharField(max_length=10, blank=True, null=True)
     suppress = models.CharField(max_length=1, blank=True, null=True)
@@ -91,12 +91,12 @@ class Rxndoc(models.Model):
 
 
 class Rxnrel(models.Model):
-    rxcui1 = models.CharField(max_length=8, blank=True, null=True)
-    rxaui1 = models.CharField(max_length=8, blank=True, null=True)
+    rxcui1 = models.CharField(max_length=8, blank=True, null=True, db_index=True)
+    rxaui1 = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     stype1 = models.CharField(max_length=50, blank=True, null=True)
     rel = models.CharField(max_length=4, blank=True, null=True)
-    rxcui2 = models.CharField(max_length=8, blank=True, null=True)
-    rxaui2 = models.CharField(max_length=8, blank=True, null=True)
+    rxcui2 = models.CharField(max_length=8, blank=True, null=True, db_index=True)
+    rxaui2 = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     stype2 = models.CharField(max_length=50, blank=True, null=True)
     rela = models.CharField(max_length=100, blank=True, null=True)
     rui = models.CharField(max_length=10, blank=True, null=True)
@@ -148,12 +148,12 @@ class Rxnsab(models.Model):
 
 
 class Rxnsat(models.Model):
-    rxcui = models.CharField(max_length=8, blank=True, null=True)
+    rxcui = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     lui = models.CharField(max_length=8, blank=True, null=True)
     sui = models.CharField(max_length=8, blank=True, null=True)
-    rxaui = models.CharField(max_length=8, blank=True, null=True)
+    rxaui = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     stype = models.CharField(max_length=50, blank=True, null=True)
-    code = models.CharField(max_length=50, blank=True, null=True)
+    code = models.CharField(max_length=50, blank=True, null=True, db_index=True)
     atui = models.CharField(max_length=11, blank=True, null=True)
     satui = models.CharField(max_length=50, blank=True, null=True)
     atn = models.CharField(max_length=1000, blank=True, null=True)
@@ -169,7 +169,7 @@ class Rxnsat(models.Model):
 
 
 class Rxnsty(models.Model):
-    rxcui = models.CharField(max_length=8, blank=True, null=True)
+    rxcui = models.CharField(max_length=8, blank=True, null=True, db_index=True)
     tui = models.CharField(max_length=4, blank=True, null=True)
     stn = models.CharField(max_length=100, blank=True, null=True)
     sty = models.CharField(max_length=50, blank=True, null=True)
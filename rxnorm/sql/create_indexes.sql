@@ -0,0 +1,32 @@
+-- Lookup indexes for the RxNorm tables. The rxnorm models are managed = False, so Django
+-- never creates these; run once against the RxNorm database (safe to re-run):
+--
+--   psql "$RXNORM_DSN" -f rxnorm/sql/create_indexes.sql
+--
+-- CONCURRENTLY avoids locking the tables against reads while the indexes build, but
+-- cannot run inside a transaction block (do not wrap this file in BEGIN/COMMIT).
+-- Keep this list in sync with the db_index=True fields in rxnorm/models.py.
+
+SET search_path TO rxnorm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnconso_rxcui ON rxnconso (rxcui);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnconso_rxaui ON rxnconso (rxaui);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnconso_code ON rxnconso (code);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnconso_sab ON rxnconso (sab);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnconso_tty ON rxnconso (tty);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnrel_rxcui1 ON rxnrel (rxcui1);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnrel_rxaui1 ON rxnrel (rxaui1);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnrel_rxcui2 ON rxnrel (rxcui2);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnrel_rxaui2 ON rxnrel (rxaui2);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnsat_rxcui ON rxnsat (rxcui);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnsat_rxaui ON rxnsat (rxaui);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnsat_code ON rxnsat (code);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rxnsty_rxcui ON rxnsty (rxcui);
+
+ANALYZE rxnconso;
+ANALYZE rxnrel;
+ANALYZE rxnsat;
+ANALYZE rxnsty;
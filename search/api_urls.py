@@ -2,11 +2,17 @@
 URL configuration for API endpoints.
 """
 from django.urls import path
+from django.views.decorators.cache import cache_page
 from . import api_views
 
+# The excipient category list only changes when the spreadsheet/table is reloaded
+EXCIPIENT_CATEGORIES_CACHE_SECONDS = 3600
+
 urlpatterns = [
     path('drug-autocomplete/', api_views.drug_autocomplete, name='drug-autocomplete'),
+    # Compressed by the view itself, which flushes per chunk; gzip_page would hold the stream back
     path('search/', api_views.search_drugs, name='search'),
-    path('excipient-categories/', api_views.excipient_categories, name='excipient-categories'),
+    path('excipient-categories/',
+         cache_page(EXCIPIENT_CATEGORIES_CACHE_SECONDS)(api_views.excipient_categories),
+         name='excipient-categories'),
 ]
-
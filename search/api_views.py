@@ -1,24 +1,71 @@
 """
 DRF API views for DailyMed search functionality.
 """
-import sys
 import json
+import logging
 import re
-from django.http import StreamingHttpResponse
+import functools
+import hashlib
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from urllib.parse import quote
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .services import DailyMedService, search_rxnorm_logic
+from .services import DailyMedService, DAILYMED_LINK_FMT, search_rxnorm_logic
 from .excipient_loader import get_excipient_categories
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Try to import models for local development (database mode)
 try:
-    from .models import ExcipientCategory, Excipient
+    from .models import ExcipientCategory
     USE_DATABASE = True
-except (ImportError, Exception):
+except ImportError:
     # Models not available (e.g., in Vercel deployment without database)
     USE_DATABASE = False
 
 
+_ROUTE_NAMES = ('Oral', 'Injectable', 'Topical', 'Intravenous', 'Ophthalmic',
+                'Sublingual', 'Intramuscular', 'Subcutaneous', 'Rectal', 'Vaginal',
+                'Otic', 'Nasal', 'Inhalation', 'Transdermal', 'Buccal')
+_FORM_SUFFIXES = (' Pill', ' Tablet', ' Capsule', ' Solution', ' Suspension', ' Cream',
+                  ' Ointment', ' Injection', ' Syrup', ' Gel', ' Lotion', ' Spray',
+                  ' Drops', ' Patch', ' Suppository', ' Film', ' Powder', ' Granules',
+                  ' Lozenge', ' Paste', ' Delayed Release', ' Extended Release',
+                  ' ER', ' DR', ' SR', ' XR', ' pellets', ' Pellets')
+
+# Compiled once at import; extract_base_drug_name runs for every fallback search
+_PAREN_TAIL_RE = re.compile(r'\s*\([^)]*\)\s*$')
+_STRENGTH_RE = re.compile(r'\s+\d+\.?\d*\s*(?:mg|ml|mcg|g|%|units?|iu)\s*.*$', re.IGNORECASE)
+# Everything from the first route word on (" Drug Oral Tablet", " Drug Oral (...)")
+_ROUTE_TAIL_RE = re.compile(
+    r' (?:%s)\s*(?:\(.*?\))?\s*(?:Pill|Tablet|Capsule|.*)?$' % '|'.join(_ROUTE_NAMES), re.IGNORECASE
+)
+# A trailing parenthesized route, e.g. " Drug (Oral Pill)"
+_ROUTE_PAREN_RE = re.compile(r'\s*\((?:%s).*?\)\s*$' % '|'.join(_ROUTE_NAMES), re.IGNORECASE)
+# Form suffixes are stripped one after another, so each keeps its own paren pattern
+_FORM_SUFFIX_PATTERNS = tuple(
+    (suffix.lower(), re.compile(rf'\s*\({re.escape(suffix.strip())}.*?\)\s*$', re.IGNORECASE))
+    for suffix in _FORM_SUFFIXES
+)
+_TRAILING_SEPARATORS_RE = re.compile(r'[,\s]+$')
+_FIRST_WORD_RE = re.compile(r'^([A-Za-z0-9]+)')
+
+
+# Pure function of one string; pagination re-runs it on the same drug name
+@functools.lru_cache(maxsize=4096)
 def extract_base_drug_name(drug_name: str) -> str:
     """
     Extract the base drug name from various formats, removing route, form, and strength information.
@@ -41,46 +88,39 @@ def extract_base_drug_name(drug_name: str) -> str:
     
     # Remove content in parentheses (e.g., "(Oral Pill)", "(Injectable)")
     # This handles autocomplete formats like "ADVIL (Oral Pill)"
-    base_drug_name = re.sub(r'\s*\([^)]*\)\s*$', '', base_drug_name).strip()
+    base_drug_name = _PAREN_TAIL_RE.sub('', base_drug_name).strip()
     
     # Remove strength patterns (numbers with units) and everything after
     # This handles cases like "Duloxetine Hydrochloride 20 MG Oral Tablet"
-    strength_pattern = r'\s+\d+\.?\d*\s*(?:mg|ml|mcg|g|%|units?|iu)\s*.*$'
-    base_drug_name = re.sub(strength_pattern, '', base_drug_name, flags=re.IGNORECASE).strip()
-    
-    # Remove route suffixes (with or without parentheses)
-    route_suffixes = [' Oral', ' Injectable', ' Topical', ' Intravenous', ' Ophthalmic', 
-             ' Sublingual', ' Intramuscular', ' Subcutaneous', ' Rectal', ' Vaginal',
-             ' Otic', ' Nasal', ' Inhalation', ' Transdermal', ' Buccal']
-    for route_suffix in route_suffixes:
-        # Handle both " Drug Oral" and " Drug (Oral)" formats
-        base_drug_name = re.sub(rf'{re.escape(route_suffix)}\s*(?:\(.*?\))?\s*(?:Pill|Tablet|Capsule|.*)?$', '', base_drug_name, flags=re.IGNORECASE).strip()
-        # Also handle route in parentheses at the end
-        base_drug_name = re.sub(rf'\s*\({re.escape(route_suffix.strip())}.*?\)\s*$', '', base_drug_name, flags=re.IGNORECASE).strip()
+    base_drug_name = _STRENGTH_RE.sub('', base_drug_name).strip()
+    
+    # Remove route suffixes (with or without parentheses). The tail pattern cuts at the
+    # first route word, which is where applying each route in turn ended up as well
+    base_drug_name = _ROUTE_TAIL_RE.sub('', base_drug_name).strip()
+    base_drug_name = _ROUTE_PAREN_RE.sub('', base_drug_name).strip()
     
     # Remove form suffixes (must be at the end, with or without parentheses)
-    form_suffixes = [' Pill', ' Tablet', ' Capsule', ' Solution', ' Suspension', ' Cream', 
-            ' Ointment', ' Injection', ' Syrup', ' Gel', ' Lotion', ' Spray', 
-            ' Drops', ' Patch', ' Suppository', ' Film', ' Powder', ' Granules', 
-            ' Lozenge', ' Paste', ' Delayed Release', ' Extended Release', 
-            ' ER', ' DR', ' SR', ' XR', ' pellets', ' Pellets']
-    for form_suffix in form_suffixes:
+    base_drug_name_lower = base_drug_name.lower()
+    for form_suffix_lower, form_paren_re in _FORM_SUFFIX_PATTERNS:
         # Handle both " Drug Pill" and " Drug (Pill)" formats
-        if base_drug_name.lower().endswith(form_suffix.lower()):
-            base_drug_name = base_drug_name[:-len(form_suffix)].strip()
+        if base_drug_name_lower.endswith(form_suffix_lower):
+            base_drug_name = base_drug_name[:-len(form_suffix_lower)].strip()
+            base_drug_name_lower = base_drug_name.lower()
         # Also handle form in parentheses at the end
-        base_drug_name = re.sub(rf'\s*\({re.escape(form_suffix.strip())}.*?\)\s*$', '', base_drug_name, flags=re.IGNORECASE).strip()
+        if base_drug_name.endswith(')'):
+            base_drug_name = form_paren_re.sub('', base_drug_name).strip()
+            base_drug_name_lower = base_drug_name.lower()
     
     # Remove any remaining parentheses and their content at the end
-    base_drug_name = re.sub(r'\s*\([^)]*\)\s*$', '', base_drug_name).strip()
+    base_drug_name = _PAREN_TAIL_RE.sub('', base_drug_name).strip()
     
     # Remove trailing punctuation, commas, and extra spaces
-    base_drug_name = re.sub(r'[,\s]+$', '', base_drug_name).strip()
+    base_drug_name = _TRAILING_SEPARATORS_RE.sub('', base_drug_name).strip()
     
     # If we've removed everything, fall back to original (but try to extract just the first word)
     if not base_drug_name:
         # Try to get just the first word as fallback
-        first_word_match = re.match(r'^([A-Za-z0-9]+)', drug_name.strip())
+        first_word_match = _FIRST_WORD_RE.match(drug_name.strip())
         if first_word_match:
             base_drug_name = first_word_match.group(1)
         else:
@@ -89,6 +129,191 @@ def extract_base_drug_name(drug_name: str) -> str:
     return base_drug_name
 
 
+# Fallback encoder producing the same compact UTF-8 output as orjson (no \uXXXX escapes)
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False).encode
+
+
+def _ndjson_line(obj: dict) -> bytes:
+    """Serializes one object as an NDJSON line (orjson when installed, it's several times faster)."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return _json_encode(obj).encode() + b"\n"
+
+
+async def _aiterate(iterator):
+    """Drives a blocking iterator from the event loop, one item per worker-thread hop."""
+    done = object()
+    next_item = sync_to_async(next, thread_sensitive=False)
+    try:
+        while True:
+            item = await next_item(iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            try:
+                await sync_to_async(close, thread_sensitive=False)()
+            except ValueError:
+                pass  # Cancelled while the iterator was still running in its thread
+
+
+def _stream_content(request, iterator):
+    """
+    Adapts a generator to the server's streaming model. Django buffers a sync iterator
+    completely under ASGI (and an async one under WSGI), so each needs its own kind.
+    """
+    if isinstance(request, ASGIRequest):
+        return _aiterate(iterator)
+    return iterator
+
+
+_ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+def _gzip_stream(iterator):
+    """
+    Gzips a byte stream chunk by chunk. Each chunk is sync-flushed, so it reaches the client
+    as soon as it is produced (Django's gzip_page/GZipMiddleware only flush at the end).
+    """
+    compressor = zlib.compressobj(wbits=31)  # 16 + MAX_WBITS: gzip container
+    try:
+        for chunk in iterator:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def _excipient_matcher(excipients_lower):
+    """
+    Builds the check for whether a result's inactive ingredients contain any of the
+    highlighted excipients, i.e. an excipient occurs in an ingredient name or the name
+    occurs in an excipient.
+
+    Returns:
+        A function taking the lowercased inactive ingredient names, or None when there are
+        no excipients.
+    """
+    if not excipients_lower:
+        return None
+    
+    # Excipient inside ingredient: one alternation scan over the joined names.
+    # Ingredient inside excipient: one substring scan per name over the joined excipients.
+    # NUL never occurs in either, so no match can straddle two names.
+    excipient_re = re.compile("|".join(re.escape(exc) for exc in sorted(excipients_lower, key=len, reverse=True)))
+    excipients_joined = "\0".join(excipients_lower)
+    
+    def contains_excipient(inactive_lower) -> bool:
+        """Takes the result's inactive ingredient names, already lowercased."""
+        if excipient_re.search("\0".join(inactive_lower)):
+            return True
+        return any(ing_lower in excipients_joined for ing_lower in inactive_lower)
+    
+    return contains_excipient
+
+
+def _valid_active_ingredient(ing: dict) -> dict:
+    """Returns the ingredient with a non-empty name ("Unknown") and strength ("N/A")."""
+    return {
+        **ing,
+        "name": (ing.get("name") or "").strip() or "Unknown",
+        "strength": (ing.get("strength") or "").strip() or "N/A",
+    }
+
+
+def _finalize_result(result: dict, contains_excipient, totals: dict, all_active_dosage: bool = False) -> bytes:
+    """
+    Shapes one search result for the frontend, counts it into totals and returns its NDJSON
+    "result" line.
+    
+    Args:
+        result: Result dict from search_with_filters (with inactive_lower); updated in place
+        contains_excipient: Matcher from _excipient_matcher, or None
+        totals: Running total_free/total_with/total counts
+        all_active_dosage: List every active ingredient in "dosage" instead of only the main one
+    """
+    # Determine if result contains excluded excipients (for categorization/highlighting)
+    inactive_lower = result.pop("inactive_lower")  # Lowercased once upstream; not sent to the client
+    contains_excluded_excipient = bool(contains_excipient and contains_excipient(inactive_lower))
+    
+    # Use NDC and packager info from parsed XML (extracted in _parse_spl_xml)
+    set_id = result.get('set_id', '')
+    
+    # Map 'labeler' (from XML) to 'packager' (expected by frontend)
+    result["packager"] = result.get("labeler", "N/A")
+    
+    # Ensure NDC is set (it should come from XML now)
+    if "ndc" not in result or result["ndc"] is None:
+        result["ndc"] = "N/A"
+    result["dailymed_link"] = DAILYMED_LINK_FMT % set_id
+    result["drug_type"] = result.get("form_code_display", "N/A")
+    
+    # Ensure active is always a list
+    active = result.get("active", [])
+    if not isinstance(active, list):
+        active = []
+    
+    # Remove any non-dict items and ensure all dicts have name and strength
+    valid_active = [_valid_active_ingredient(ing) for ing in active if isinstance(ing, dict)]
+    
+    # Set active back to result with only valid ingredients
+    result["active"] = valid_active
+    # name/strength are always present and stripped by now, so they are read directly
+    if not valid_active:
+        result["dosage"] = "N/A"
+    elif all_active_dosage and len(valid_active) > 1:
+        result["dosage"] = ", ".join([f"{ing['name']} {ing['strength']}" for ing in valid_active])
+    else:
+        # Only use the first (main) active ingredient for dosage (for a single one, that's the whole list)
+        main_ing = valid_active[0]
+        result["dosage"] = f"{main_ing['name']} {main_ing['strength']}"
+    
+    # Count it in the appropriate category
+    # If we have excluded excipients, categorize for highlighting
+    # Otherwise, all results go to "free" category
+    if contains_excluded_excipient:
+        totals["total_with"] += 1
+        category = "with"
+    else:
+        totals["total_free"] += 1
+        category = "free"
+    totals["total"] += 1
+    
+    return _ndjson_line({
+        "type": "result",
+        "category": category,
+        "result": result,
+        "metadata": totals
+    })
+
+
+# Typeahead sends the same prefixes over and over ("aspi", "aspir", ...); suggestions are
+# reused for this long before DailyMed is asked again
+AUTOCOMPLETE_CACHE_TTL = 600
+# Seconds the browser may reuse a suggestion list before revalidating it by ETag
+AUTOCOMPLETE_BROWSER_MAX_AGE = 60
+
+
+# Seconds a completed search stream is replayed for an identical request
+SEARCH_STREAM_CACHE_TTL = 300
+# Larger streams are not replayed: the body is held in the worker until the search ends,
+# and cache backends such as memcached reject items over 1 MB
+SEARCH_STREAM_CACHE_MAX_BYTES = 256 * 1024
+
+
+@functools.cache
+def _get_service() -> DailyMedService:
+    """
+    Returns the shared DailyMedService. Its HTTP session, API response cache and parsed-SPL
+    cache then outlive a request, and concurrent searches for the same label share one download.
+    """
+    return DailyMedService()
+
+
 @api_view(['GET'])
 def drug_autocomplete(request):
     """
@@ -108,26 +333,127 @@ def drug_autocomplete(request):
         }
     """
     query = request.GET.get('q', '').strip()
-    limit = int(request.GET.get('limit', 20))
     
     if not query:
         return Response([], status=status.HTTP_200_OK)
     
     try:
-        # Initialize service
-        service = DailyMedService()
+        limit = _int_param(request, 'limit', 20)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        # Suggestions only depend on the uppercased query (see get_dailymed_suggestions)
+        cache_key = f"autocomplete:{limit}:{quote(query.upper())}"
+        suggestions = cache.get(cache_key)
+        if suggestions is None:
+            # Use the new method to get suggestions from DailyMed
+            suggestions = _get_service().get_dailymed_suggestions(query, limit)
+            # An empty list may just be a failed upstream call, so don't hold on to it
+            if suggestions:
+                cache.set(cache_key, suggestions, AUTOCOMPLETE_CACHE_TTL)
         
-        # Use the new method to get suggestions from DailyMed
-        suggestions = service.get_dailymed_suggestions(query, limit)
+        # Same as above: an empty list isn't tagged, so the browser doesn't keep a failure
+        if not suggestions:
+            return Response(suggestions, status=status.HTTP_200_OK)
         
-        return Response(suggestions, status=status.HTTP_200_OK)
+        # Typeahead re-requests the same prefix on backspace/re-type; let the browser
+        # revalidate its copy instead of downloading the list again
+        etag = quote_etag(hashlib.blake2b(_json_encode(suggestions).encode(), digest_size=8).hexdigest())
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = Response(suggestions, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        response['Cache-Control'] = f'private, max-age={AUTOCOMPLETE_BROWSER_MAX_AGE}'
+        return response
     except Exception as e:
-        import traceback
-        print(f"Error in drug_autocomplete endpoint: {e}", file=sys.stderr)
-        print(traceback.format_exc(), file=sys.stderr)
+        logger.exception("Error in drug_autocomplete endpoint: %s", e)
         return Response([], status=status.HTTP_200_OK)
 
 
+def _split_param(request, name: str) -> Optional[Tuple[str, ...]]:
+    """Parses a comma-separated query parameter into its non-empty, stripped items (None if there are none)."""
+    items = tuple(filter(None, (item.strip() for item in request.GET.get(name, '').split(','))))
+    return items or None
+
+
+def _int_param(request, name: str, default: int) -> int:
+    """Parses a positive integer query parameter, raising ValueError with a client-facing message."""
+    value = request.GET.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer") from None
+    if number < 1:
+        raise ValueError(f"'{name}' must be at least 1")
+    return number
+
+
+@dataclass(frozen=True)
+class SearchParams:
+    """
+    Query parameters of a search request, parsed and validated once. Immutable and
+    hashable, so the parsed request itself serves as the stream cache key.
+    """
+    drug_name: str
+    rxcui: Optional[str]
+    ndc: Optional[str]  # Kept with dashes - DailyMed API prefers this format
+    setid: Optional[str]
+    drug_class_code: Optional[str]
+    excipients: Tuple[str, ...]  # For highlighting only (legacy)
+    page: int
+    pagesize: int
+    route: Optional[str]
+    form: Optional[Tuple[str, ...]]
+    only_active: Optional[Tuple[str, ...]]
+    include_active: Optional[Tuple[str, ...]]
+    exclude_active: Optional[Tuple[str, ...]]
+    include_inactive: Optional[Tuple[str, ...]]
+    exclude_inactive: Optional[Tuple[str, ...]]
+    
+    @classmethod
+    def from_request(cls, request) -> "SearchParams":
+        """
+        Builds the parameters from request.GET.
+        
+        Raises:
+            ValueError: With a message for the client if a parameter is missing or malformed.
+        """
+        params = cls(
+            drug_name=request.GET.get('drug', '').strip(),
+            rxcui=request.GET.get('rxcui', '').strip() or None,
+            ndc=request.GET.get('ndc', '').strip() or None,
+            setid=request.GET.get('setid', '').strip() or None,
+            drug_class_code=request.GET.get('drug_class_code', '').strip() or None,
+            excipients=_split_param(request, 'excipients') or (),
+            page=_int_param(request, 'page', 1),
+            pagesize=_int_param(request, 'pagesize', 25),
+            route=request.GET.get('route', '').strip() or None,
+            form=_split_param(request, 'form'),
+            only_active=_split_param(request, 'only-active'),
+            include_active=_split_param(request, 'include-active'),
+            exclude_active=_split_param(request, 'exclude-active'),
+            include_inactive=_split_param(request, 'include-inactive'),
+            exclude_inactive=_split_param(request, 'exclude-inactive'),
+        )
+        # Validate that at least one search parameter is provided
+        if not (params.drug_name or params.rxcui or params.ndc or params.setid or params.drug_class_code):
+            raise ValueError("Either drug name, rxcui, ndc, setid, or drug_class_code is required")
+        return params
+    
+    def cache_key(self) -> str:
+        """Stable text identifying the search (every parameter, in a fixed order)."""
+        return _json_encode([
+            self.drug_name, self.rxcui, self.ndc, self.setid, self.drug_class_code,
+            self.excipients, self.page, self.pagesize, self.route, self.form,
+            self.only_active, self.include_active, self.exclude_active,
+            self.include_inactive, self.exclude_inactive,
+        ])
+
+
 def search_drugs_stream(request):
     """
     Streaming API endpoint for searching drugs with advanced ingredient filtering.
@@ -149,151 +475,96 @@ def search_drugs_stream(request):
     Returns:
         Stream of JSON objects, one per line (NDJSON format)
     """
-    drug_name = request.GET.get('drug', '').strip()
-    rxcui = request.GET.get('rxcui', '').strip() or None
-    ndc = request.GET.get('ndc', '').strip() or None
-    # Keep NDC with dashes - DailyMed API prefers this format
-    setid = request.GET.get('setid', '').strip() or None
-    drug_class_code = request.GET.get('drug_class_code', '').strip() or None
-    excipients_str = request.GET.get('excipients', '').strip()
-    page = int(request.GET.get('page', 1))
-    pagesize = int(request.GET.get('pagesize', 25))
-    
-    # Validate that at least one search parameter is provided
-    if not drug_name and not rxcui and not ndc and not setid and not drug_class_code:
-        return Response(
-            {"error": "Either drug name, rxcui, ndc, setid, or drug_class_code is required"},
-            status=status.HTTP_400_BAD_REQUEST
-        )
+    try:
+        params = SearchParams.from_request(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
     # If both are provided, prefer rxcui but keep drug_name as fallback
     # If only rxcui is provided, we'll try to extract drug name from it if search fails
+    drug_name, rxcui, ndc, setid, drug_class_code = (
+        params.drug_name, params.rxcui, params.ndc, params.setid, params.drug_class_code
+    )
+    excipients, page, pagesize, route, form = (
+        params.excipients, params.page, params.pagesize, params.route, params.form
+    )
+    only_active, include_active, exclude_active, include_inactive, exclude_inactive = (
+        params.only_active, params.include_active, params.exclude_active,
+        params.include_inactive, params.exclude_inactive
+    )
     
-    # Parse filter parameters
-    route = request.GET.get('route', '').strip() or None
-    form_str = request.GET.get('form', '').strip()
-    form = [f.strip() for f in form_str.split(',') if f.strip()] if form_str else None
-    
-    only_active_str = request.GET.get('only-active', '').strip()
-    only_active = [ing.strip() for ing in only_active_str.split(',') if ing.strip()] if only_active_str else None
-    
-    include_active_str = request.GET.get('include-active', '').strip()
-    include_active = [ing.strip() for ing in include_active_str.split(',') if ing.strip()] if include_active_str else None
-    
-    exclude_active_str = request.GET.get('exclude-active', '').strip()
-    exclude_active = [ing.strip() for ing in exclude_active_str.split(',') if ing.strip()] if exclude_active_str else None
-    
-    include_inactive_str = request.GET.get('include-inactive', '').strip()
-    include_inactive = [ing.strip() for ing in include_inactive_str.split(',') if ing.strip()] if include_inactive_str else None
-    
-    exclude_inactive_str = request.GET.get('exclude-inactive', '').strip()
-    exclude_inactive = [ing.strip() for ing in exclude_inactive_str.split(',') if ing.strip()] if exclude_inactive_str else None
-    
-    # Parse excipients from comma-separated string (for highlighting only)
-    excipients = [exc.strip() for exc in excipients_str.split(',') if exc.strip()] if excipients_str else []
+    # The same search is often re-requested within minutes (UI toggles, back/forward);
+    # a completed stream is replayed as-is instead of repeating every upstream fetch
+    stream_cache_key = "search_stream:" + hashlib.sha1(params.cache_key().encode()).hexdigest()
+    completed = False
     
     def generate():
+        nonlocal completed
         try:
-            service = DailyMedService()
+            service = _get_service()
             
-            # Combine exclude-inactive and legacy excipients for highlighting
-            all_excipients_for_highlight = list(set(exclude_inactive + excipients)) if exclude_inactive else excipients
+            # Combine exclude-inactive and legacy excipients for categorization/highlighting
+            all_excipients = list(set(exclude_inactive + excipients)) if exclude_inactive else excipients
             
             # Send initial metadata
-            yield json.dumps({
+            yield _ndjson_line({
                 "type": "init",
-                "excipients_highlighted": all_excipients_for_highlight
-            }) + "\n"
+                "excipients_highlighted": all_excipients
+            })
             
-            # Track results as they come in
-            results_free = []
-            results_with = []
-            # Combine exclude-inactive and legacy excipients for categorization/highlighting
-            all_excipients_for_categorization = list(set(exclude_inactive + excipients)) if exclude_inactive else excipients
-            excipients_lower = {exc.lower() for exc in all_excipients_for_categorization} if all_excipients_for_categorization else set()
+            # Running counts of streamed results; one dict, serialized into each frame as it goes
+            totals = {"total_free": 0, "total_with": 0, "total": 0}
+            contains_excipient = _excipient_matcher({exc.lower() for exc in all_excipients})
+            
+            # Filters shared by every search below; each priority branch only picks the identifier
+            filter_kwargs = dict(
+                page=page,
+                pagesize=pagesize,
+                route=route,
+                form=form,
+                only_active=only_active,
+                include_active=include_active,
+                exclude_active=exclude_active,
+                include_inactive=include_inactive
+            )
             
             # Try different search types in priority order: Set ID > NDC > RxCUI > Drug Class > Drug Name
-            mock_args = None
+            search_kwargs = None
             
             # Priority 1: Set ID (most specific)
             if setid:
-                mock_args = service._create_mock_args(
-                    drug_name=None,
-                    rxcui=None,
-                    ndc=None,
-                    setid=setid,
-                    drug_class_code=None,
-                    page=page,
-                    pagesize=pagesize,
-                    route=route,
-                    form=form,
-                    only_active=only_active,
-                    include_active=include_active,
-                    exclude_active=exclude_active,
-                    include_inactive=include_inactive,
-                    exclude_inactive=exclude_inactive
-                )
-                print(f"Using Set ID {setid} for search", file=sys.stderr)
+                search_kwargs = dict(setid=setid)
+                logger.info("Using Set ID %s for search", setid)
             # Priority 2: NDC
             elif ndc:
                 # DailyMed API prefers NDC with dashes, so use as-is
                 # Test if NDC search returns any results
                 test_results = service.api.search_spls(ndc=ndc, pagesize=1, page=1)
                 if test_results.get("data") and len(test_results.get("data", [])) > 0:
-                    print(f"Using NDC {ndc} for search (found {len(test_results.get('data', []))} initial results)", file=sys.stderr)
-                    mock_args = service._create_mock_args(
-                        drug_name=None,
-                        rxcui=None,
-                        ndc=ndc,
-                        setid=None,
-                        drug_class_code=None,
-                        page=page,
-                        pagesize=pagesize,
-                        route=route,
-                        form=form,
-                        only_active=only_active,
-                        include_active=include_active,
-                        exclude_active=exclude_active,
-                        include_inactive=include_inactive,
-                        exclude_inactive=exclude_inactive
-                    )
+                    logger.info("Using NDC %s for search (found %s initial results)", ndc, len(test_results.get('data', [])))
+                    search_kwargs = dict(ndc=ndc)
                 else:
                     # NDC search returned no results - try without dashes as fallback
                     ndc_no_dashes = ndc.replace('-', '')
                     if ndc_no_dashes != ndc:
-                        print(f"NDC {ndc} search returned no results, trying without dashes: {ndc_no_dashes}", file=sys.stderr)
+                        logger.info("NDC %s search returned no results, trying without dashes: %s", ndc, ndc_no_dashes)
                         test_no_dashes = service.api.search_spls(ndc=ndc_no_dashes, pagesize=1, page=1)
                         if test_no_dashes.get("data") and len(test_no_dashes.get("data", [])) > 0:
-                            print(f"Found results with NDC format {ndc_no_dashes}, using that", file=sys.stderr)
-                            mock_args = service._create_mock_args(
-                                drug_name=None,
-                                rxcui=None,
-                                ndc=ndc_no_dashes,
-                                setid=None,
-                                drug_class_code=None,
-                                page=page,
-                                pagesize=pagesize,
-                                route=route,
-                                form=form,
-                                only_active=only_active,
-                                include_active=include_active,
-                                exclude_active=exclude_active,
-                                include_inactive=include_inactive,
-                                exclude_inactive=exclude_inactive
-                            )
+                            logger.info("Found results with NDC format %s, using that", ndc_no_dashes)
+                            search_kwargs = dict(ndc=ndc_no_dashes)
                         else:
                             # No results with either format
-                            yield json.dumps({
+                            yield _ndjson_line({
                                 "type": "error",
                                 "error": f"No results found for NDC {ndc}. Please verify the NDC code is correct."
-                            }) + "\n"
+                            })
                             return
                     else:
                         # Already tried without dashes, no results
-                        yield json.dumps({
+                        yield _ndjson_line({
                             "type": "error",
                             "error": f"No results found for NDC {ndc}. Please verify the NDC code is correct."
-                        }) + "\n"
+                        })
                         return
             # Priority 3: RxCUI
             elif rxcui:
@@ -307,390 +578,148 @@ def search_drugs_stream(request):
                     if drug_name:
                         base_drug_name = extract_base_drug_name(drug_name)
                     
-                    mock_args = service._create_mock_args(
-                        drug_name=base_drug_name,  # Pass extracted name for fallback
-                        rxcui=rxcui,
-                        ndc=None,
-                        setid=None,
-                        drug_class_code=None,
-                        page=page,
-                        pagesize=pagesize,
-                        route=route,
-                        form=form,
-                        only_active=only_active,
-                        include_active=include_active,
-                        exclude_active=exclude_active,
-                        include_inactive=include_inactive,
-                        exclude_inactive=exclude_inactive
-                    )
-                    print(f"Using RxCUI {rxcui} for search (found {len(test_results.get('data', []))} initial results)", file=sys.stderr)
+                    # Pass extracted name for fallback
+                    search_kwargs = dict(drug_name=base_drug_name, rxcui=rxcui)
+                    logger.info("Using RxCUI %s for search (found %s initial results)", rxcui, len(test_results.get('data', [])))
                     if base_drug_name:
-                        print(f"  Drug name '{base_drug_name}' available as fallback if needed", file=sys.stderr)
+                        logger.info("  Drug name '%s' available as fallback if needed", base_drug_name)
                 else:
                     # RxCUI search returned no results, fall back to drug_name
-                    print(f"RxCUI {rxcui} returned no results, falling back to drug_name search", file=sys.stderr)
+                    logger.info("RxCUI %s returned no results, falling back to drug_name search", rxcui)
                     if drug_name:
                         base_drug_name = extract_base_drug_name(drug_name)
                         
-                        mock_args = service._create_mock_args(
-                            drug_name=base_drug_name,
-                            rxcui=None,
-                            ndc=None,
-                            setid=None,
-                            drug_class_code=None,
-                            page=page,
-                            pagesize=pagesize,
-                            route=route,
-                            form=form,
-                            only_active=only_active,
-                            include_active=include_active,
-                            exclude_active=exclude_active,
-                            include_inactive=include_inactive,
-                            exclude_inactive=exclude_inactive
-                        )
-                        print(f"Falling back to drug_name '{base_drug_name}' (extracted from '{drug_name}') for search", file=sys.stderr)
+                        search_kwargs = dict(drug_name=base_drug_name)
+                        logger.info("Falling back to drug_name '%s' (extracted from '%s') for search", base_drug_name, drug_name)
                     else:
                         # No drug_name available
-                        print(f"No drug_name available and RxCUI {rxcui} has no results", file=sys.stderr)
-                        yield json.dumps({
+                        logger.info("No drug_name available and RxCUI %s has no results", rxcui)
+                        yield _ndjson_line({
                             "type": "error",
                             "error": f"No results found for RxCUI {rxcui}. Please try searching by drug name instead."
-                        }) + "\n"
+                        })
                         return
             # Priority 4: Drug Class Code
             elif drug_class_code:
-                mock_args = service._create_mock_args(
-                    drug_name=None,
-                    rxcui=None,
-                    ndc=None,
-                    setid=None,
-                    drug_class_code=drug_class_code,
-                    page=page,
-                    pagesize=pagesize,
-                    route=route,
-                    form=form,
-                    only_active=only_active,
-                    include_active=include_active,
-                    exclude_active=exclude_active,
-                    include_inactive=include_inactive,
-                    exclude_inactive=exclude_inactive
-                )
-                print(f"Using drug_class_code '{drug_class_code}' for search", file=sys.stderr)
+                search_kwargs = dict(drug_class_code=drug_class_code)
+                logger.info("Using drug_class_code '%s' for search", drug_class_code)
             # Priority 5: Drug Name (default)
             else:
                 if not drug_name:
-                    yield json.dumps({
+                    yield _ndjson_line({
                         "type": "error",
                         "error": "Either drug name, rxcui, ndc, setid, or drug_class_code is required"
-                    }) + "\n"
+                    })
                     return
                 
                 # Extract base drug name using helper function
                 base_drug_name = extract_base_drug_name(drug_name)
                 
-                mock_args = service._create_mock_args(
-                    drug_name=base_drug_name,
-                    rxcui=None,
-                    ndc=None,
-                    setid=None,
-                    drug_class_code=None,
-                    page=page,
-                    pagesize=pagesize,
-                    route=route,
-                    form=form,
-                    only_active=only_active,
-                    include_active=include_active,
-                    exclude_active=exclude_active,
-                    include_inactive=include_inactive,
-                    exclude_inactive=exclude_inactive
-                )
-                print(f"Using drug_name '{base_drug_name}' (extracted from '{drug_name}') for search", file=sys.stderr)
+                search_kwargs = dict(drug_name=base_drug_name)
+                logger.info("Using drug_name '%s' (extracted from '%s') for search", base_drug_name, drug_name)
             
-            if not mock_args:
-                yield json.dumps({
+            if not search_kwargs:
+                yield _ndjson_line({
                     "type": "error",
                     "error": "Unable to create search parameters"
-                }) + "\n"
+                })
                 return
             
             # IMPORTANT: For excipient filtering, we want to show ALL results, not filter them out
             # So we'll get all results and categorize them based on excipient presence
-            # Create a modified mock_args without exclude_inactive so we get ALL results
-            all_results_mock_args = service._create_mock_args(
-                drug_name=mock_args.drug_name if hasattr(mock_args, 'drug_name') else None,
-                rxcui=mock_args.rxcui if hasattr(mock_args, 'rxcui') else None,
-                ndc=mock_args.ndc if hasattr(mock_args, 'ndc') else None,
-                setid=mock_args.setid if hasattr(mock_args, 'setid') else None,
-                drug_class_code=mock_args.drug_class_code if hasattr(mock_args, 'drug_class_code') else None,
-                page=page,
-                pagesize=pagesize,
-                route=route,
-                form=form,
-                only_active=only_active,
-                include_active=include_active,
-                exclude_active=exclude_active,
-                include_inactive=include_inactive,
-                exclude_inactive=None  # Don't filter - we want ALL results to categorize
-            )
+            # (exclude_inactive only drives the highlighting, so it isn't passed on)
+            all_results_mock_args = service._create_mock_args(**search_kwargs, **filter_kwargs)
             
             # Stream results from search_with_filters
             # All results at this point have already passed the filters (except exclude_inactive)
             result_count = 0
-            for result in service.api.search_with_filters(all_results_mock_args):
-                # Skip None results (generator may yield None when no results found)
-                if result is None:
-                    continue
-                
-                # Ensure result is a dictionary
-                if not isinstance(result, dict):
-                    continue
-                
-                result_count += 1
-                
-                # Determine if result contains excluded excipients (for categorization/highlighting)
-                contains_excluded_excipient = False
-                if excipients_lower:
-                    inactive_ingredients = result.get("inactive", [])
-                    inactive_lower = {ing.lower() for ing in inactive_ingredients}
-                    
-                    for exc_lower in excipients_lower:
-                        for ing_lower in inactive_lower:
-                            if exc_lower in ing_lower or ing_lower in exc_lower:
-                                contains_excluded_excipient = True
-                                break
-                        if contains_excluded_excipient:
-                            break
-                
-                # Use NDC and packager info from parsed XML (extracted in _parse_spl_xml)
-                set_id = result.get('set_id', '')
-                
-                # Map 'labeler' (from XML) to 'packager' (expected by frontend)
-                result["packager"] = result.get("labeler", "N/A")
-                
-                # Ensure NDC is set (it should come from XML now)
-                if "ndc" not in result or result["ndc"] is None:
-                    result["ndc"] = "N/A"
-                result["dailymed_link"] = f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid={set_id}"
-                result["drug_type"] = result.get("form_code_display", "N/A")
-                
-                # Ensure active is always a list
-                active = result.get("active", [])
-                if not isinstance(active, list):
-                    active = []
-                
-                # Filter and ensure each active ingredient has the expected structure
-                # Remove any non-dict items and ensure all dicts have name and strength
-                valid_active = []
-                for ing in active:
-                    if not isinstance(ing, dict):
-                        continue  # Skip non-dict items
-                    # Ensure required fields exist and are not empty
-                    name = ing.get("name", "").strip() if ing.get("name") else ""
-                    if not name:
-                        name = "Unknown"
-                    ing["name"] = name
+            for batch in service.api.search_with_filters_batched(all_results_mock_args, keep_inactive_lower=True):
+                chunk = []
+                for result in batch:
+                    # Skip None results (generator may yield None when no results found)
+                    if result is None:
+                        continue
                     
-                    strength = ing.get("strength", "").strip() if ing.get("strength") else ""
-                    if not strength:
-                        strength = "N/A"
-                    ing["strength"] = strength
+                    # Ensure result is a dictionary
+                    if not isinstance(result, dict):
+                        continue
                     
-                    valid_active.append(ing)
-                
-                # Set active back to result with only valid ingredients
-                result["active"] = valid_active
-                # Only use the first (main) active ingredient for dosage
-                if valid_active and len(valid_active) > 0:
-                    main_ing = valid_active[0]
-                    result["dosage"] = f"{main_ing.get('name', '')} {main_ing.get('strength', '')}".strip()
-                else:
-                    result["dosage"] = "N/A"
+                    result_count += 1
+                    chunk.append(_finalize_result(result, contains_excipient, totals))
                 
-                # Add to appropriate list
-                # If we have excluded excipients, categorize for highlighting
-                # Otherwise, all results go to "free" category
-                if excipients_lower and contains_excluded_excipient:
-                    results_with.append(result)
-                    category = "with"
-                else:
-                    results_free.append(result)
-                    category = "free"
+                # Write out everything that arrived together in one chunk
+                if chunk:
+                    yield b"".join(chunk)
                 
-                # Stream the result
-                yield json.dumps({
-                    "type": "result",
-                    "category": category,
-                    "result": result,
-                    "metadata": {
-                        "total_free": len(results_free),
-                        "total_with": len(results_with),
-                        "total": len(results_free) + len(results_with)
-                    }
-                }) + "\n"
-            
             # If RxCUI search returned no results and we have a drug_name, try drug_name search as fallback
-            if result_count == 0 and rxcui and drug_name and mock_args.drug_name:
-                print(f"RxCUI {rxcui} search returned no filtered results, trying drug_name '{mock_args.drug_name}' as fallback", file=sys.stderr)
-                # Create new mock_args with drug_name instead of RxCUI
-                fallback_mock_args = service._create_mock_args(
-                    drug_name=mock_args.drug_name if hasattr(mock_args, 'drug_name') else None,
-                    rxcui=None,
-                    ndc=None,
-                    setid=None,
-                    drug_class_code=None,
-                    page=page,
-                    pagesize=pagesize,
-                    route=route,
-                    form=form,
-                    only_active=only_active,
-                    include_active=include_active,
-                    exclude_active=exclude_active,
-                    include_inactive=include_inactive,
-                    exclude_inactive=exclude_inactive
-                )
-                
-                # Create modified fallback args without exclude_inactive to get ALL results
+            if result_count == 0 and rxcui and drug_name and all_results_mock_args.drug_name:
+                logger.info("RxCUI %s search returned no filtered results, trying drug_name '%s' as fallback", rxcui, all_results_mock_args.drug_name)
+                # Same filters, searching by drug_name instead of RxCUI (again without exclude_inactive to get ALL results)
                 fallback_all_results_args = service._create_mock_args(
-                    drug_name=fallback_mock_args.drug_name,
-                    rxcui=None,
-                    page=page,
-                    pagesize=pagesize,
-                    route=route,
-                    form=form,
-                    only_active=only_active,
-                    include_active=include_active,
-                    exclude_active=exclude_active,
-                    include_inactive=include_inactive,
-                    exclude_inactive=None  # Don't filter - we want ALL results to categorize
+                    drug_name=all_results_mock_args.drug_name, **filter_kwargs
                 )
                 
                 # Try drug_name search
-                for result in service.api.search_with_filters(fallback_all_results_args):
-                    if result is None or not isinstance(result, dict):
-                        continue
-                    
-                    result_count += 1
-                    
-                    # Determine if result contains excluded excipients
-                    contains_excluded_excipient = False
-                    if excipients_lower:
-                        inactive_ingredients = result.get("inactive", [])
-                        inactive_lower = {ing.lower() for ing in inactive_ingredients}
-                        
-                        for exc_lower in excipients_lower:
-                            for ing_lower in inactive_lower:
-                                if exc_lower in ing_lower or ing_lower in exc_lower:
-                                    contains_excluded_excipient = True
-                                    break
-                            if contains_excluded_excipient:
-                                break
-                    
-                    # Use NDC and packager info from parsed XML (extracted in _parse_spl_xml)
-                    set_id = result.get('set_id', '')
-                    
-                    # Map 'labeler' (from XML) to 'packager' (expected by frontend)
-                    result["packager"] = result.get("labeler", "N/A")
-                    
-                    # Ensure NDC is set (it should come from XML now)
-                    if "ndc" not in result or result["ndc"] is None:
-                        result["ndc"] = "N/A"
-                    result["dailymed_link"] = f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid={set_id}"
-                    result["drug_type"] = result.get("form_code_display", "N/A")
-                    
-                    # Ensure active is always a list and filter out invalid items
-                    active = result.get("active", [])
-                    if not isinstance(active, list):
-                        active = []
-                    
-                    # Filter and ensure each active ingredient has the expected structure
-                    valid_active = []
-                    for ing in active:
-                        if not isinstance(ing, dict):
-                            continue  # Skip non-dict items
-                        # Ensure required fields exist and are not empty
-                        name = ing.get("name", "").strip() if ing.get("name") else ""
-                        if not name:
-                            name = "Unknown"
-                        ing["name"] = name
-                        
-                        strength = ing.get("strength", "").strip() if ing.get("strength") else ""
-                        if not strength:
-                            strength = "N/A"
-                        ing["strength"] = strength
+                for batch in service.api.search_with_filters_batched(fallback_all_results_args, keep_inactive_lower=True):
+                    chunk = []
+                    for result in batch:
+                        if result is None or not isinstance(result, dict):
+                            continue
                         
-                        valid_active.append(ing)
+                        result_count += 1
+                        # The name fallback has always listed every active ingredient in the dosage
+                        chunk.append(_finalize_result(result, contains_excipient, totals, all_active_dosage=True))
                     
-                    # Set active back to result with only valid ingredients
-                    result["active"] = valid_active
-                    result["dosage"] = ", ".join([f"{ing.get('name', '')} {ing.get('strength', '')}" for ing in valid_active]) if valid_active else "N/A"
-                    
-                    # Add to appropriate list
-                    if excipients_lower and contains_excluded_excipient:
-                        results_with.append(result)
-                        category = "with"
-                    else:
-                        results_free.append(result)
-                        category = "free"
-                    
-                    # Stream the result
-                    yield json.dumps({
-                        "type": "result",
-                        "category": category,
-                        "result": result,
-                        "metadata": {
-                            "total_free": len(results_free),
-                            "total_with": len(results_with),
-                            "total": len(results_free) + len(results_with)
-                        }
-                    }) + "\n"
-            
+                    # Write out everything that arrived together in one chunk
+                    if chunk:
+                        yield b"".join(chunk)
+                
             # Send completion message
-            yield json.dumps({
+            yield _ndjson_line({
                 "type": "complete",
-                "metadata": {
-                    "total_free": len(results_free),
-                    "total_with": len(results_with),
-                    "total": len(results_free) + len(results_with)
-                }
-            }) + "\n"
+                "metadata": totals
+            })
+            completed = True
             
         except Exception as e:
-            import traceback
-            print(f"Error in search_drugs_stream: {e}", file=sys.stderr)
-            print(traceback.format_exc(), file=sys.stderr)
-            yield json.dumps({
+            logger.exception("Error in search_drugs_stream: %s", e)
+            yield _ndjson_line({
                 "type": "error",
                 "error": str(e)
-            }) + "\n"
+            })
     
-    response = StreamingHttpResponse(generate(), content_type='application/x-ndjson')
-    response['Cache-Control'] = 'no-cache'
-    response['X-Accel-Buffering'] = 'no'
-    return response
+    def generate_and_store():
+        chunks = []
+        size = 0
+        for chunk in generate():
+            if chunks is not None:
+                size += len(chunk)
+                if size <= SEARCH_STREAM_CACHE_MAX_BYTES:
+                    chunks.append(chunk)
+                else:
+                    # Too large to replay; stop holding it and just stream the rest through
+                    chunks = None
+            yield chunk
+        # Searches that ended in an error are not replayed
+        if completed and chunks is not None:
+            cache.set(stream_cache_key, b"".join(chunks), SEARCH_STREAM_CACHE_TTL)
+    
+    cached_stream = cache.get(stream_cache_key)
+    content = iter((cached_stream,)) if cached_stream is not None else generate_and_store()
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', 'Vary': 'Accept-Encoding'}
+    # NDJSON repeats the same keys and URLs on every line, so it compresses well
+    if _ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        content = _gzip_stream(content)
+        headers['Content-Encoding'] = 'gzip'
+    return StreamingHttpResponse(
+        _stream_content(request, content),
+        content_type='application/x-ndjson; charset=utf-8',
+        headers=headers,
+    )
 
 
-def search_drugs(request):
-    """
-    API endpoint for searching drugs with advanced ingredient filtering.
-    Uses streaming endpoint for better performance.
-    
-    Query params:
-        drug: Drug name to search for (required)
-        excipients: Comma-separated list of excipient names (for highlighting only, legacy)
-        page: Page number (default: 1)
-        pagesize: Results per page (default: 25)
-        route: Route of administration filter
-        form: Comma-separated list of dosage forms
-        only-active: Comma-separated list of active ingredients (results must ONLY contain these)
-        include-active: Comma-separated list of active ingredients that MUST be present
-        exclude-active: Comma-separated list of active ingredients that MUST NOT be present
-        include-inactive: Comma-separated list of inactive ingredients that MUST be present
-        exclude-inactive: Comma-separated list of inactive ingredients that MUST NOT be present
-    
-    Returns:
-        Streaming response with results as they are found
-    """
-    return search_drugs_stream(request)
+# The search endpoint is the streaming view itself; bound directly so requests skip a trampoline frame
+search_drugs = search_drugs_stream
 
 
 @api_view(['GET'])
@@ -709,17 +738,23 @@ def excipient_categories(request):
         # Try database first (for local development), fall back to Excel file (for Vercel)
         if USE_DATABASE:
             try:
-                categories = ExcipientCategory.objects.all().prefetch_related('excipients')
+                # One LEFT JOIN over (category, ingredient) pairs in category display order;
+                # categories without excipients come back once with a None ingredient
+                rows = ExcipientCategory.objects.values_list('name', 'excipients__ingredient_name')
                 result = {}
                 
-                for category in categories:
-                    excipients = list(category.excipients.values_list('ingredient_name', flat=True))
-                    result[category.name] = sorted(excipients)
+                for category_name, ingredient_name in rows.iterator(chunk_size=2000):
+                    excipients = result.setdefault(category_name, [])
+                    if ingredient_name is not None:
+                        excipients.append(ingredient_name)
+                
+                for excipients in result.values():
+                    excipients.sort()
                 
                 return Response(result, status=status.HTTP_200_OK)
             except Exception as db_error:
                 # Database query failed, fall back to Excel file
-                print(f"Database query failed, falling back to Excel file: {db_error}", file=sys.stderr)
+                logger.warning("Database query failed, falling back to Excel file: %s", db_error)
                 result = get_excipient_categories()
                 return Response(result, status=status.HTTP_200_OK)
         else:
@@ -728,9 +763,7 @@ def excipient_categories(request):
             return Response(result, status=status.HTTP_200_OK)
             
     except Exception as e:
-        import traceback
-        print(f"Error in excipient_categories endpoint: {e}", file=sys.stderr)
-        print(traceback.format_exc(), file=sys.stderr)
+        logger.exception("Error in excipient_categories endpoint: %s", e)
         return Response(
             {"error": "Failed to retrieve excipient categories"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
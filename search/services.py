@@ -4,7 +4,11 @@ Wraps the DailyMed API client for use in Django views.
 """
 import sys
 import re
-from typing import Dict, Any, Optional, List, Generator
+import traceback
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Generator, Tuple
 import requests
 import json
 import xml.etree.ElementTree as ET
@@ -24,6 +28,37 @@ spec.loader.exec_module(dailymed_client)
 
 DailyMedAPI = dailymed_client.DailyMedAPI
 
+# DailyMed label page for a set ID (results' 'dailymed_link')
+DAILYMED_LINK_FMT = "https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid=%s"
+
+# Split drug names into words on spaces, hyphens, slashes, parentheses, brackets, commas, periods
+_NAME_WORD_SPLIT_RE = re.compile(r'[\s\-_/\(\)\[\],\.]+')
+_LEADING_NON_ALPHA_RE = re.compile(r'^[^A-Z]+')
+
+
+def _word_prefix_match(name_upper: str, query_upper: str) -> Optional[bool]:
+    """
+    Checks whether the query starts any word of an uppercased drug name.
+
+    Returns:
+        None if no word matches, otherwise whether the matching word is the first one.
+    """
+    for i, word in enumerate(_NAME_WORD_SPLIT_RE.split(name_upper)):
+        if not word:
+            continue
+        
+        # Remove any leading non-alphabetic characters (like ".", "-", etc.)
+        # This handles cases like ".ALPHA.-TOCOPHEROL" -> "ALPHA" and "TOCOPHEROL"
+        word_clean = _LEADING_NON_ALPHA_RE.sub('', word)
+        if not word_clean:
+            continue
+        
+        # Include any word that starts with the keyword, even if there are more characters after it
+        # "ACE" matches "ACE", "ACEBUTOLOL", "ACETONIDE", "ACETATE", etc.
+        if word_clean.startswith(query_upper):
+            return i == 0
+    return None
+
 
 class DailyMedService:
     """
@@ -31,8 +66,43 @@ class DailyMedService:
     Provides methods for autocomplete and search with excipient filtering.
     """
     
+    # Number of queries whose complete suggestion lists are kept for prefix reuse
+    SUGGESTION_PREFIX_CACHE_SIZE = 512
+    # Seconds a complete list is trusted before DailyMed is asked again, so new or renamed
+    # listings show up (same lifetime as the views' autocomplete cache)
+    SUGGESTION_PREFIX_CACHE_TTL = 600
+    
     def __init__(self):
         self.api = DailyMedAPI()
+        # query -> (time.monotonic() when stored, every (name, first_word_match) DailyMed had
+        # for it), kept only when the listing was exhausted. Any longer query's matches are a
+        # subset of these.
+        self._complete_suggestions: "OrderedDict[str, Tuple[float, List[Tuple[str, bool]]]]" = OrderedDict()
+        self._complete_suggestions_lock = threading.Lock()
+    
+    def _get_prefix_candidates(self, query_upper: str) -> Optional[List[Tuple[str, bool]]]:
+        """Returns the complete suggestion list of the longest cached, unexpired prefix of the query, if any."""
+        oldest_valid = time.monotonic() - self.SUGGESTION_PREFIX_CACHE_TTL
+        with self._complete_suggestions_lock:
+            for end in range(len(query_upper), 0, -1):
+                prefix = query_upper[:end]
+                entry = self._complete_suggestions.get(prefix)
+                if entry is None:
+                    continue
+                if entry[0] < oldest_valid:
+                    del self._complete_suggestions[prefix]
+                    continue
+                self._complete_suggestions.move_to_end(prefix)
+                return entry[1]
+        return None
+    
+    def _store_prefix_candidates(self, query_upper: str, candidates: List[Tuple[str, bool]]):
+        """Remembers a query's complete suggestion list for later, longer queries."""
+        with self._complete_suggestions_lock:
+            self._complete_suggestions[query_upper] = (time.monotonic(), candidates)
+            self._complete_suggestions.move_to_end(query_upper)
+            if len(self._complete_suggestions) > self.SUGGESTION_PREFIX_CACHE_SIZE:
+                self._complete_suggestions.popitem(last=False)
     
     def _create_mock_args(
         self, 
@@ -107,84 +177,29 @@ class DailyMedService:
             if not query_upper:
                 return []
             
-            suggestions = []
-            seen_names = set()
-            current_page = 1
-            pagesize = 100  # Use max pagesize to get more results per page
-            max_pages = 5  # Fetch more pages to get better results before sorting
-            target_collect = limit * 3  # Collect more results than needed for better sorting
-            
-            # Paginate through results to get enough matches
-            while len(suggestions) < target_collect and current_page <= max_pages:
-                # Fetch from DailyMed API using the updated client method
-                # DailyMed performs a 'contains' search by default, so we get more results to filter
-                response = self.api.get_drug_names(drug_name=query, pagesize=pagesize, page=current_page)
-                data = response.get('data', [])
-                
-                if not data:
-                    break  # No more results
-                
-                for item in data:
-                    if len(suggestions) >= target_collect:
-                        break
-                    
-                    name = item.get('drug_name')
-                    if not name:
-                        continue
-                    
-                    name_upper = name.upper().strip()
-                    
-                    # Skip duplicates
-                    if name_upper in seen_names:
-                        continue
-                    
-                    # Check if keyword appears at the start of any word in the drug name
-                    # Split on word boundaries: spaces, hyphens, slashes, parentheses, brackets, commas, periods
-                    # This ensures "ace" matches "ACE INHIBITOR", "ACEBUTOLOL", "ACETONIDE", "ACETATE" (all start with "ACE")
-                    words = re.split(r'[\s\-_/\(\)\[\],\.]+', name_upper)
-                    matches = False
-                    first_word_matches = False
-                    
-                    for i, word in enumerate(words):
-                        if not word:
-                            continue
-                        
-                        # Remove any leading non-alphabetic characters (like ".", "-", etc.)
-                        # This handles cases like ".ALPHA.-TOCOPHEROL" -> "ALPHA" and "TOCOPHEROL"
-                        word_clean = re.sub(r'^[^A-Z]+', '', word)
-                        if not word_clean:
-                            continue
-                        
-                        # Check if the cleaned word starts with the query
-                        # Include any word that starts with the keyword, even if there are more characters after it
-                        # "ACE" matches "ACE", "ACEBUTOLOL", "ACETONIDE", "ACETATE", etc.
-                        if word_clean.startswith(query_upper):
-                            matches = True
-                            if i == 0:  # First word matches
-                                first_word_matches = True
-                            break
-                    
-                    # Only include if keyword starts any word
-                    if not matches:
-                        continue
-                    
-                    seen_names.add(name_upper)
-                    suggestions.append({
-                        'label': name_upper,
-                        'value': '', 
-                        'metadata': {},
-                        '_first_word_match': first_word_matches  # Track for sorting
-                    })
-                
-                # Check if there are more pages
-                metadata = response.get('metadata', {})
-                total_pages = int(metadata.get('total_pages', 0))
-                current_page_num = int(metadata.get('current_page', current_page))
-                
-                if current_page_num >= total_pages:
-                    break  # No more pages
-                
-                current_page += 1
+            # A longer query only matches names its cached prefix already matched (DailyMed's
+            # listing is a 'contains' search and the word-start check narrows monotonically),
+            # so typing "ASPI" -> "ASPIR" -> "ASPIRI" filters locally instead of re-paginating
+            prefix_candidates = self._get_prefix_candidates(query_upper)
+            if prefix_candidates is not None:
+                suggestions = []
+                for name_upper, _ in prefix_candidates:
+                    first_word_match = _word_prefix_match(name_upper, query_upper)
+                    if first_word_match is not None:
+                        suggestions.append({
+                            'label': name_upper,
+                            'value': '',
+                            'metadata': {},
+                            '_first_word_match': first_word_match
+                        })
+            else:
+                # Collect more results than needed for better sorting
+                suggestions, complete = self._collect_dailymed_suggestions(query, query_upper, limit * 3)
+                if complete:
+                    self._store_prefix_candidates(
+                        query_upper,
+                        [(suggestion['label'], suggestion['_first_word_match']) for suggestion in suggestions]
+                    )
             
             # Sort suggestions to match DailyMed's behavior:
             # 1. First word matches first (drug name starts with query) - highest priority
@@ -204,10 +219,77 @@ class DailyMedService:
             return suggestions[:limit]
         except Exception as e:
             print(f"Error fetching DailyMed suggestions: {e}", file=sys.stderr)
-            import traceback
             print(traceback.format_exc(), file=sys.stderr)
             return []
     
+    def _collect_dailymed_suggestions(
+        self,
+        query: str,
+        query_upper: str,
+        target_collect: int
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Paginates DailyMed's drug name listing, keeping names where the query starts a word.
+
+        Returns:
+            The unsorted suggestions (with '_first_word_match' set) and whether the listing
+            was exhausted, i.e. the suggestions are every match DailyMed has.
+        """
+        suggestions = []
+        seen_names = set()
+        current_page = 1
+        pagesize = 100  # Use max pagesize to get more results per page
+        max_pages = 5  # Fetch more pages to get better results before sorting
+        
+        # Paginate through results to get enough matches
+        while len(suggestions) < target_collect and current_page <= max_pages:
+            # Fetch from DailyMed API using the updated client method
+            # DailyMed performs a 'contains' search by default, so we get more results to filter
+            response = self.api.get_drug_names(drug_name=query, pagesize=pagesize, page=current_page)
+            data = response.get('data', [])
+            
+            if not data:
+                return suggestions, True  # No more results
+            
+            for item in data:
+                if len(suggestions) >= target_collect:
+                    break
+                
+                name = item.get('drug_name')
+                if not name:
+                    continue
+                
+                name_upper = name.upper().strip()
+                
+                # Skip duplicates
+                if name_upper in seen_names:
+                    continue
+                
+                # Only include if keyword starts any word
+                first_word_match = _word_prefix_match(name_upper, query_upper)
+                if first_word_match is None:
+                    continue
+                
+                seen_names.add(name_upper)
+                suggestions.append({
+                    'label': name_upper,
+                    'value': '', 
+                    'metadata': {},
+                    '_first_word_match': first_word_match  # Track for sorting
+                })
+            
+            # Check if there are more pages
+            metadata = response.get('metadata', {})
+            total_pages = int(metadata.get('total_pages', 0))
+            current_page_num = int(metadata.get('current_page', current_page))
+            
+            if current_page_num >= total_pages:
+                return suggestions, len(suggestions) < target_collect  # No more pages
+            
+            current_page += 1
+        
+        return suggestions, False
+    
     def get_drug_autocomplete(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
         Get drug name suggestions using RxNorm Approximate Match API (Matches MTM Logic).
@@ -305,7 +387,6 @@ class DailyMedService:
             
         except Exception as e:
             print(f"Error in RxNorm autocomplete: {e}", file=sys.stderr)
-            import traceback
             print(traceback.format_exc(), file=sys.stderr)
             return []
     
@@ -430,7 +511,6 @@ class DailyMedService:
             
         except Exception as e:
             print(f"Error in RxTerms fallback for 3-char query: {e}", file=sys.stderr)
-            import traceback
             print(traceback.format_exc(), file=sys.stderr)
             return []
     
@@ -550,7 +630,7 @@ class DailyMedService:
                 # Only add basic fields
                 result["ndc"] = "N/A"
                 result["packager"] = "N/A"
-                result["dailymed_link"] = f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid={result.get('set_id', '')}"
+                result["dailymed_link"] = DAILYMED_LINK_FMT % result.get('set_id', '')
                 result["drug_type"] = result.get("form_code_display", "N/A")
                 active = result.get("active", [])
                 result["dosage"] = ", ".join([f"{ing.get('name', '')} {ing.get('strength', '')}" for ing in active]) if active else "N/A"
@@ -576,7 +656,7 @@ class DailyMedService:
             # Only add basic fields
             result["ndc"] = "N/A"
             result["packager"] = "N/A"
-            result["dailymed_link"] = f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid={result.get('set_id', '')}"
+            result["dailymed_link"] = DAILYMED_LINK_FMT % result.get('set_id', '')
             result["drug_type"] = result.get("form_code_display", "N/A")
             active = result.get("active", [])
             # Only use the first (main) active ingredient for dosage
@@ -632,7 +712,7 @@ class DailyMedService:
             packager = "N/A"
         
         # Create DailyMed link
-        dailymed_link = f"https://dailymed.nlm.nih.gov/dailymed/drugInfo.cfm?setid={set_id}"
+        dailymed_link = DAILYMED_LINK_FMT % set_id
         
         # Determine drug type from form
         form = result.get("form_code_display", "N/A")
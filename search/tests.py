@@ -0,0 +1,163 @@
+import argparse
+import io
+import json
+import zlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from . import api_views
+from .services import DailyMedAPI, DailyMedService
+
+
+def _result(set_id):
+    return {
+        "set_id": set_id,
+        "title": f"DRUG {set_id} tablet",
+        "active": [{"name": "Ibuprofen", "strength": "200 mg"}],
+        "inactive": ("Starch",),
+        "inactive_lower": ("starch",),
+    }
+
+
+class FakeAPI:
+    """Stands in for DailyMedAPI, recording how far the search has been consumed."""
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.exhausted = False
+
+    def search_with_filters_batched(self, args, keep_inactive_lower=False):
+        for batch in self.batches:
+            yield [dict(result) for result in batch]
+        self.exhausted = True
+
+
+class FakeService:
+    _create_mock_args = DailyMedService._create_mock_args
+
+    def __init__(self, api):
+        self.api = api
+
+
+class SearchStreamTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = FakeAPI([[_result("a")], [_result("b"), _result("c")]])
+        patcher = mock.patch.object(api_views, "_get_service", return_value=FakeService(self.api))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _first_result_before_exhausted(self, decode):
+        """Reads the stream until a result line shows up; the search must still be running."""
+        response = self.client.get("/api/search/", {"drug": "x"}, **self.extra)
+        received = b""
+        for chunk in response.streaming_content:
+            received += decode(chunk)
+            lines = [json.loads(line) for line in received.split(b"\n") if line]
+            if any(line["type"] == "result" for line in lines):
+                self.assertFalse(self.api.exhausted)
+                break
+        else:
+            self.fail("no result line in the stream")
+        response.close()
+        return response
+
+    def test_first_result_streams_before_search_ends(self):
+        self.extra = {}
+        response = self._first_result_before_exhausted(lambda chunk: chunk)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_gzipped_first_result_streams_before_search_ends(self):
+        self.extra = {"HTTP_ACCEPT_ENCODING": "gzip, deflate"}
+        decompressor = zlib.decompressobj(wbits=31)
+        response = self._first_result_before_exhausted(decompressor.decompress)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_gzipped_stream_decodes_to_the_plain_stream(self):
+        plain = b"".join(self.client.get("/api/search/", {"drug": "y"}).streaming_content)
+        cache.clear()
+        gzipped = b"".join(
+            self.client.get("/api/search/", {"drug": "y"}, HTTP_ACCEPT_ENCODING="gzip").streaming_content
+        )
+        self.assertEqual(zlib.decompress(gzipped, wbits=31), plain)
+
+
+KIT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<document xmlns="urn:hl7-org:v3">
+  <title>SURGICAL PREP PACK</title>
+  <setId root="%s"/>
+  <versionNumber value="1"/>
+  <component><structuredBody><component><section><code code="48780-1"/>
+    <subject><manufacturedProduct><manufacturedProduct>
+      <name>Surgical Prep Pack</name>
+      <formCode displayName="KIT"/>
+    </manufacturedProduct></manufacturedProduct></subject>
+  </section></component></structuredBody></component>
+</document>"""
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+        self.raw = io.BytesIO(content)
+        self.status_code = 200
+        self.headers = {}
+        self.encoding = "utf-8"
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        yield self.content
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FormPushdownTests(SimpleTestCase):
+    """The form filter skips SPL downloads from the listing title only when it can tell."""
+
+    LISTING = [
+        # A kit whose title names no dosage form; its XML says KIT
+        {"setid": "kit", "spl_version": 1, "title": "SURGICAL PREP PACK (POVIDONE-IODINE, ISOPROPYL ALCOHOL) [ACME]"},
+        # Names a dosage form that wasn't asked for
+        {"setid": "tab", "spl_version": 1, "title": "IBUPROFEN (IBUPROFEN) TABLET, FILM COATED [ACME]"},
+    ]
+
+    def setUp(self):
+        self.fetched = []
+        self.api = DailyMedAPI()
+        self.api._session.get = self._get
+
+    def _get(self, url, params=None, **kwargs):
+        if url.endswith("/spls.json"):
+            return FakeResponse(json.dumps({
+                "data": self.LISTING,
+                "metadata": {"total_pages": 1, "current_page": 1},
+            }).encode())
+        set_id = url.rsplit("/", 1)[1].split(".")[0]
+        self.fetched.append(set_id)
+        return FakeResponse((KIT_XML % set_id).encode())
+
+    def test_kit_title_without_a_form_is_still_fetched(self):
+        args = argparse.Namespace(
+            drug_name="prep", rxcui=None, ndc=None, setid=None, drug_class_code=None, unii_code=None,
+            page=1, pagesize=25, route=None, form=["kit"], only_active=None, include_active=None,
+            exclude_active=None, include_inactive=None, exclude_inactive=None,
+        )
+        with mock.patch("sys.stdout"):
+            results = list(self.api.search_with_filters(args))
+        self.assertEqual([result["set_id"] for result in results], ["kit"])
+        self.assertEqual(self.fetched, ["kit"])